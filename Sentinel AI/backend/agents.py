@@ -1,16 +1,114 @@
+from enum import IntEnum
+
+import numpy as np
+
 LEVELS = ["LOW", "MEDIUM", "HIGH"]
 LEVEL_INDEX = {level: idx for idx, level in enumerate(LEVELS)}
 
 
-def _severity_from_features(features):
+class Level(IntEnum):
+    LOW = 0
+    MEDIUM = 1
+    HIGH = 2
+
+
+class Pattern(IntEnum):
+    SURGE = 0
+    DROP = 1
+    BROAD = 2
+    DEFAULT = 3
+
+
+# Decision table indexed [level][pattern]: (action, base confidence, rationale).
+ACTIONS = (
+    (
+        ("Apply soft caps and re-check in next cycle", 0.6,
+         "Minor uptick observed; gentle dampening is enough."),
+        ("Log deviation and verify sensors during routine checks", 0.58,
+         "Small dip likely noise but worth logging."),
+        ("Document pattern and expand automated watchlist", 0.59,
+         "Light multi-signal variance detected."),
+        ("Continue operations with automated monitoring", 0.55,
+         "No acute pressure despite anomaly flag.")
+    ),
+    (
+        ("Rate-limit transactions and queue secondary screening", 0.75,
+         "Upward drift manageable with throttling."),
+        ("Hold low-signal workloads and request operator check", 0.73,
+         "Falling metric needs verification before resuming."),
+        ("Schedule rapid review with ops and tighten monitoring thresholds", 0.74,
+         "Multiple pressure points need coordinated scrutiny."),
+        ("Keep workflows running with elevated watch", 0.72,
+         "Moderate anomaly without clear pattern.")
+    ),
+    (
+        ("Freeze affected flows and escalate to incident lead", 0.9,
+         "Rapid upward pressure warrants an immediate halt."),
+        ("Pause payouts, validate data feeds, and alert finance oversight", 0.88,
+         "Sharp drop could signal tampering or outages."),
+        ("Lock down impacted services and convene crisis bridge", 0.89,
+         "Coordinated anomalies require cross-team response."),
+        ("Enforce manual approval on all risky operations", 0.87,
+         "General instability detected at high risk.")
+    )
+)
+
+COMMAND_SETS = (
+    (
+        "Continue with monitoring enabled",
+        "Log deviation and re-evaluate next cycle",
+        "Notify ops lead of minor variance"
+    ),
+    (
+        "Throttle high-risk operations and schedule rapid review",
+        "Enable enhanced monitoring for flagged segments",
+        "Run secondary verification on suspect batches"
+    ),
+    (
+        "Escalate to incident command and freeze flows",
+        "Quarantine affected services and require manual overrides",
+        "Route transactions through safe path with human approval"
+    )
+)
+
+_AGREE = "Risk score corroborates analyst narrative."
+_SCORE_HIGHER = "Score indicates higher risk than analyst summary; conservative stance applied."
+_ANALYST_HIGHER = "Analyst highlighted greater pressure than score; hedging with uncertainty."
+
+
+def _risk_outcome(score_idx, analyst_idx):
+    gap = abs(score_idx - analyst_idx)
+    if gap == 0:
+        return Level(score_idx), _AGREE, 1.0
+    note = _SCORE_HIGHER if score_idx > analyst_idx else _ANALYST_HIGHER
+    return Level(max(score_idx, analyst_idx)), note, 0.85 if gap == 1 else 0.75
+
+
+# Every (score level, analyst level) pair resolved once: (chosen level, note, confidence modifier).
+RISK_TABLE = tuple(tuple(_risk_outcome(score, analyst) for analyst in Level) for score in Level)
+
+_PATTERN_REASONS = {
+    Pattern.SURGE: "{feature} is accelerating upward.",
+    Pattern.DROP: "{feature} is sliding below safe bounds.",
+    Pattern.BROAD: "Multiple metrics are moving together.",
+    Pattern.DEFAULT: "{feature} is unstable versus baseline."
+}
+_STABLE_REASON = "Signals stable; precautionary oversight recommended."
+
+
+def _severity_code(features):
     if not features:
-        return "LOW"
+        return Level.LOW
     max_dev = max(f.get("deviation_sigma", 0.0) for f in features)
     if max_dev >= 2.5 or len(features) >= 3:
-        return "HIGH"
+        return Level.HIGH
     if max_dev >= 1.5 or len(features) >= 2:
-        return "MEDIUM"
-    return "LOW"
+        return Level.MEDIUM
+    return Level.LOW
+
+
+def _severity_from_features(features):
+    return LEVELS[_severity_code(features)]
 
 
 def analyst_agent(summary):
@@ -39,39 +137,27 @@ def analyst_agent(summary):
     }
 
 
-def _level_from_score(score):
+def _level_code(score):
     if score >= 0.67:
-        return "HIGH"
+        return Level.HIGH
     if score >= 0.33:
-        return "MEDIUM"
-    return "LOW"
+        return Level.MEDIUM
+    return Level.LOW
 
 
-def risk_agent(analyst_report, score):
-    score_level = _level_from_score(score)
-    analyst_level = analyst_report.get("severity_hint", "LOW")
-    score_idx = LEVEL_INDEX.get(score_level, 0)
-    analyst_idx = LEVEL_INDEX.get(analyst_level, 0)
-    gap = abs(score_idx - analyst_idx)
+def _level_from_score(score):
+    return LEVELS[_level_code(score)]
 
-    if gap == 0:
-        chosen = score_level
-        note = "Risk score corroborates analyst narrative."
-        modifier = 1.0
-    else:
-        chosen = LEVELS[max(score_idx, analyst_idx)]
-        modifier = 0.85 if gap == 1 else 0.75
-        if score_idx > analyst_idx:
-            note = "Score indicates higher risk than analyst summary; conservative stance applied."
-        else:
-            note = "Analyst highlighted greater pressure than score; hedging with uncertainty."
 
-    return chosen, note, modifier
+def risk_agent(analyst_report, score):
+    analyst_idx = LEVEL_INDEX.get(analyst_report.get("severity_hint", "LOW"), 0)
+    chosen, note, modifier = RISK_TABLE[_level_code(score)][analyst_idx]
+    return LEVELS[chosen], note, modifier
 
 
-def _pattern_from_features(top_features):
+def _pattern_code(top_features):
     if not top_features:
-        return "default", "Signals stable; precautionary oversight recommended."
+        return Pattern.DEFAULT, None
 
     primary = top_features[0]
     direction = primary.get("direction")
@@ -79,105 +165,65 @@ def _pattern_from_features(top_features):
     feature = primary.get("feature")
 
     if direction == "above" and trend == "increasing":
-        return "surge", f"{feature} is accelerating upward."
+        return Pattern.SURGE, feature
     if direction == "below" and trend == "decreasing":
-        return "drop", f"{feature} is sliding below safe bounds."
+        return Pattern.DROP, feature
     if len(top_features) > 1:
-        return "broad", "Multiple metrics are moving together."
-    return "default", f"{feature} is unstable versus baseline."
+        return Pattern.BROAD, feature
+    return Pattern.DEFAULT, feature
 
 
-def action_agent(risk_level, summary):
-    top_features = summary.get("top_features") or []
-    pattern, pattern_reason = _pattern_from_features(top_features)
-
-    actions = {
-        "HIGH": {
-            "surge": (
-                "Freeze affected flows and escalate to incident lead",
-                0.9,
-                "Rapid upward pressure warrants an immediate halt."
-            ),
-            "drop": (
-                "Pause payouts, validate data feeds, and alert finance oversight",
-                0.88,
-                "Sharp drop could signal tampering or outages."
-            ),
-            "broad": (
-                "Lock down impacted services and convene crisis bridge",
-                0.89,
-                "Coordinated anomalies require cross-team response."
-            ),
-            "default": (
-                "Enforce manual approval on all risky operations",
-                0.87,
-                "General instability detected at high risk."
-            )
-        },
-        "MEDIUM": {
-            "surge": (
-                "Rate-limit transactions and queue secondary screening",
-                0.75,
-                "Upward drift manageable with throttling."
-            ),
-            "drop": (
-                "Hold low-signal workloads and request operator check",
-                0.73,
-                "Falling metric needs verification before resuming."
-            ),
-            "broad": (
-                "Schedule rapid review with ops and tighten monitoring thresholds",
-                0.74,
-                "Multiple pressure points need coordinated scrutiny."
-            ),
-            "default": (
-                "Keep workflows running with elevated watch",
-                0.72,
-                "Moderate anomaly without clear pattern."
-            )
-        },
-        "LOW": {
-            "surge": (
-                "Apply soft caps and re-check in next cycle",
-                0.6,
-                "Minor uptick observed; gentle dampening is enough."
-            ),
-            "drop": (
-                "Log deviation and verify sensors during routine checks",
-                0.58,
-                "Small dip likely noise but worth logging."
-            ),
-            "broad": (
-                "Document pattern and expand automated watchlist",
-                0.59,
-                "Light multi-signal variance detected."
-            ),
-            "default": (
-                "Continue operations with automated monitoring",
-                0.55,
-                "No acute pressure despite anomaly flag."
-            )
-        }
-    }
+def _pattern_reason(pattern, feature, top_features):
+    if not top_features:
+        return _STABLE_REASON
+    return _PATTERN_REASONS[pattern].format(feature=feature)
+
+
+def _pattern_from_features(top_features):
+    pattern, feature = _pattern_code(top_features)
+    return pattern.name.lower(), _pattern_reason(pattern, feature, top_features)
 
-    command_sets = {
-        "HIGH": [
-            "Escalate to incident command and freeze flows",
-            "Quarantine affected services and require manual overrides",
-            "Route transactions through safe path with human approval"
-        ],
-        "MEDIUM": [
-            "Throttle high-risk operations and schedule rapid review",
-            "Enable enhanced monitoring for flagged segments",
-            "Run secondary verification on suspect batches"
-        ],
-        "LOW": [
-            "Continue with monitoring enabled",
-            "Log deviation and re-evaluate next cycle",
-            "Notify ops lead of minor variance"
-        ]
-    }
 
-    action_text, base_conf, rationale = actions[risk_level].get(pattern, actions[risk_level]["default"])
-    reason = f"{pattern_reason} {rationale}".strip()
-    return action_text, base_conf, reason, command_sets[risk_level]
\ No newline at end of file
+def _action(level, pattern, feature, top_features):
+    action_text, base_conf, rationale = ACTIONS[level][pattern]
+    reason = f"{_pattern_reason(pattern, feature, top_features)} {rationale}".strip()
+    return action_text, base_conf, reason, list(COMMAND_SETS[level])
+
+
+def action_agent(risk_level, summary):
+    top_features = summary.get("top_features") or []
+    pattern, feature = _pattern_code(top_features)
+    return _action(LEVEL_INDEX[risk_level], pattern, feature, top_features)
+
+
+def score_levels(scores):
+    """Vectorised ``_level_from_score``: level codes for an array of risk scores."""
+    scores = np.asarray(scores, dtype=float)
+    with np.errstate(invalid="ignore"):
+        return np.where(scores >= 0.67, Level.HIGH, np.where(scores >= 0.33, Level.MEDIUM, Level.LOW))
+
+
+def risk_levels(summaries, scores):
+    """Risk level codes for many summaries at once, equal to ``risk_agent(analyst_agent(s), score)``."""
+    severity = np.fromiter(
+        (_severity_code(summary.get("top_features") or []) for summary in summaries),
+        dtype=np.int64, count=len(summaries)
+    )
+    return np.maximum(score_levels(scores), severity)
+
+
+def assess_batch(summaries, scores):
+    """Risk and action decisions for many summaries in one pass.
+
+    Returns one ``(risk_level, risk_note, confidence_modifier, action,
+    base_confidence, action_reason, command_options)`` tuple per summary, with
+    the same text ``risk_agent`` and ``action_agent`` would produce.
+    """
+    score_codes = score_levels(scores)
+    assessments = []
+    for summary, score_idx in zip(summaries, score_codes):
+        top_features = summary.get("top_features") or []
+        chosen, note, modifier = RISK_TABLE[score_idx][_severity_code(top_features)]
+        pattern, feature = _pattern_code(top_features)
+        assessments.append((LEVELS[chosen], note, modifier) + _action(chosen, pattern, feature, top_features))
+    return assessments
@@ -1,69 +1,497 @@
+import base64
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from sklearn.ensemble import IsolationForest
+import pandas as pd
 
+from .metrics import stage
+from .registry import schema_key
 
-def detect_anomalies(df):
-    numeric = df.select_dtypes(include="number").dropna(axis=1, how="all")
-    if numeric.empty:
-        # Fallback when no numeric columns exist
-        return {"mean": {}, "std": {}, "signals": ["no numeric fields detected"], "top_features": []}, 0.0
+# Engine settings. The defaults reproduce single-threaded results exactly; -1 means one per core.
+FOREST_JOBS = int(os.environ.get("SENTINEL_FOREST_JOBS", "1"))
+SCORE_THREADS = int(os.environ.get("SENTINEL_SCORE_THREADS", "1"))
+SCORE_CHUNK_ROWS = int(os.environ.get("SENTINEL_SCORE_CHUNK_ROWS", "65536"))
+# Fit on a seeded subsample of at most this many baseline rows; 0 fits on every row.
+FIT_SAMPLE_ROWS = int(os.environ.get("SENTINEL_FIT_SAMPLE_ROWS", "0"))
+FIT_SEED = int(os.environ.get("SENTINEL_FIT_SEED", "42"))
+# Detector input precision; trees work in float32 anyway, so float32 halves the matrix at no cost to the forest.
+PREPARE_DTYPE = np.dtype(os.environ.get("SENTINEL_PREPARE_DTYPE", "float32"))
+# Upper bound on float64 cells converted at once while preparing the matrix.
+PREPARE_BLOCK_CELLS = 1 << 20
 
-    filled = numeric.fillna(numeric.median())
+_SCORE_POOL = None
 
-    if len(filled) >= 2:
-        model = IsolationForest(contamination=0.1, random_state=42)
-        model.fit(filled)
+
+def _float_matrix(values):
+    # Float input (e.g. the shared float32 matrix) is used as is instead of being widened to a float64 copy.
+    values = np.asarray(values)
+    return values if values.dtype.kind == "f" else values.astype(float)
+
+
+def _worker_count(setting):
+    return max(1, os.cpu_count() or 1) if setting < 0 else max(1, setting)
+
+
+def _score_pool():
+    global _SCORE_POOL
+    if _SCORE_POOL is None:
+        _SCORE_POOL = ThreadPoolExecutor(_worker_count(SCORE_THREADS), thread_name_prefix="sentinel-score")
+    return _SCORE_POOL
+
+
+class Detector:
+    """Common interface for anomaly backends.
+
+    ``decision_function`` follows the IsolationForest convention (higher means
+    more normal), so every backend shares the same risk-score normalisation.
+    """
+
+    name = "base"
+    # Row-independent scores can be split into chunks and scored concurrently.
+    row_independent = True
+
+    def __init__(self):
+        self.fit_ms = 0.0
+
+    def fit(self, baseline):
+        start = time.perf_counter()
+        self._fit(_float_matrix(baseline))
+        self.fit_ms = round((time.perf_counter() - start) * 1000, 3)
+        return self
+
+    def decision_function(self, rows):
+        rows = _float_matrix(rows)
+        threads = _worker_count(SCORE_THREADS)
+        if threads == 1 or not self.row_independent or len(rows) <= SCORE_CHUNK_ROWS:
+            return self._score(rows)
+        # Tree traversal releases the GIL, so threads score chunks in parallel without copying rows.
+        chunks = [rows[start:start + SCORE_CHUNK_ROWS] for start in range(0, len(rows), SCORE_CHUNK_ROWS)]
+        return np.concatenate(list(_score_pool().map(self._score, chunks)))
+
+    def score_stream(self, rows, state=None):
+        """Scores the next batch of a stream; returns ``(scores, state)``.
+
+        ``state`` is what the previous batch returned (None for the first), so
+        stateful detectors continue where they left off instead of restarting
+        at every batch. Row-independent detectors carry no state.
+        """
+        return self.decision_function(rows), None
+
+    def _fit(self, baseline):
+        raise NotImplementedError
+
+    def _score(self, rows):
+        raise NotImplementedError
+
+
+class ForestDetector(Detector):
+    name = "forest"
+
+    def __init__(self, n_estimators: int = 100, max_samples="auto", name: str | None = None,
+                 n_jobs: int | None = None, random_state: int | None = None):
+        super().__init__()
+        self.n_estimators = n_estimators
+        self.max_samples = max_samples
+        self.n_jobs = FOREST_JOBS if n_jobs is None else n_jobs
+        self.random_state = FIT_SEED if random_state is None else random_state
+        if name:
+            self.name = name
+        self.model = None
+
+    def _fit(self, baseline):
+        # scikit-learn takes longer to import than the rest of the backend; load it on first fit.
+        from sklearn.ensemble import IsolationForest
+
+        max_samples = self.max_samples
+        if isinstance(max_samples, int):
+            max_samples = min(max_samples, len(baseline))
+        self.model = IsolationForest(
+            n_estimators=self.n_estimators,
+            max_samples=max_samples,
+            contamination=0.1,
+            random_state=self.random_state,
+            # Trees are built in parallel; each keeps its own seed, so results do not depend on n_jobs.
+            n_jobs=self.n_jobs
+        )
+        self.model.fit(baseline)
+
+    def _score(self, rows):
+        return self.model.decision_function(rows)
+
+
+class RobustZDetector(Detector):
+    # Median/MAD distance of the most extreme metric in each row.
+    name = "robust-z"
+
+    def _fit(self, baseline):
+        self.center = np.median(baseline, axis=0)
+        mad = np.median(np.abs(baseline - self.center), axis=0) * 1.4826
+        self.scale = np.where(mad > 0, mad, 1e-9)
+
+    def _score(self, rows):
+        return -(np.abs(rows - self.center) / self.scale).max(axis=1)
+
+
+class EwmaDetector(Detector):
+    # EWMA control chart: distance of the smoothed statistic from the baseline mean in control-limit units.
+    name = "ewma"
+    row_independent = False
+
+    def __init__(self, alpha: float = 0.3):
+        super().__init__()
+        self.alpha = alpha
+
+    def _fit(self, baseline):
+        self.center = baseline.mean(axis=0)
+        std = baseline.std(axis=0, ddof=1) if len(baseline) > 1 else np.zeros(baseline.shape[1])
+        limit = std * np.sqrt(self.alpha / (2 - self.alpha))
+        self.limit = np.where(limit > 0, limit, 1e-9)
+
+    def _smooth(self, rows, start):
+        seeded = pd.DataFrame(np.vstack([start, rows]))
+        return seeded.ewm(alpha=self.alpha, adjust=False).mean().to_numpy()[1:]
+
+    def _distance(self, smoothed):
+        return -(np.abs(smoothed - self.center) / self.limit).max(axis=1)
+
+    def _score(self, rows):
+        return self._distance(self._smooth(rows, self.center))
+
+    def score_stream(self, rows, state=None):
+        # The state is the last smoothed row, so batches chain into one series.
+        rows = _float_matrix(rows)
+        if len(rows) == 0:
+            return np.empty(0), state
+        smoothed = self._smooth(rows, self.center if state is None else state)
+        return self._distance(smoothed), smoothed[-1]
+
+
+DETECTORS = {
+    "forest": ForestDetector,
+    "forest-lite": lambda: ForestDetector(n_estimators=25, max_samples=64, name="forest-lite"),
+    "robust-z": RobustZDetector,
+    "ewma": EwmaDetector
+}
+
+# Upload sizes (rows) above which "auto" trades accuracy for latency.
+AUTO_LITE_ROWS = 50_000
+AUTO_ROBUST_ROWS = 1_000_000
+
+
+def select_detector(mode: str | None, rows: int = 0):
+    mode = mode or "forest"
+    if mode == "auto":
+        if rows >= AUTO_ROBUST_ROWS:
+            return "robust-z"
+        if rows >= AUTO_LITE_ROWS:
+            return "forest-lite"
+        return "forest"
+    if mode not in DETECTORS:
+        raise ValueError(f"Unknown detector '{mode}'. Choose one of: auto, {', '.join(DETECTORS)}")
+    return mode
+
+
+def fit_sample(baseline, limit: int | None = None, seed: int | None = None):
+    # Seeded sample without replacement, kept in original row order, so refits are reproducible.
+    limit = FIT_SAMPLE_ROWS if limit is None else limit
+    if not limit or len(baseline) <= limit:
+        return baseline
+    rng = np.random.default_rng(FIT_SEED if seed is None else seed)
+    picked = np.sort(rng.choice(len(baseline), size=limit, replace=False))
+    return baseline.iloc[picked] if hasattr(baseline, "iloc") else baseline[picked]
+
+
+def fit_detector(mode, baseline):
+    return DETECTORS[mode]().fit(fit_sample(baseline))
+
+
+def normalize_scores(score_min, score_max, score_mean):
+    # decision_function is higher for normal rows, so a low mean relative to the range means more anomalies.
+    if score_max == score_min:
+        return 0.5
+    return float(np.clip((score_max - score_mean) / (score_max - score_min + 1e-9), 0.0, 1.0))
+
+
+def trend_window(length):
+    return min(5, max(2, length // 2))
+
+
+def trend_label(prior_mean, recent_mean, spread):
+    delta = recent_mean - prior_mean
+    if abs(delta) <= spread * 0.2:
+        return "stable"
+    return "increasing" if delta > 0 else "decreasing"
+
+
+def describe_feature(feature, deviation, direction, trend_hint):
+    detail = {
+        "feature": feature,
+        "deviation_sigma": deviation,
+        "direction": direction,
+        "trend": trend_hint
+    }
+    return detail, f"{feature} running {direction} baseline ({deviation}σ) with {trend_hint} trend"
+
+
+def top_k_indices(key, k):
+    """Positions of the ``k`` largest keys, largest first, found by partial selection.
+
+    Ties keep their original order, as in a stable descending sort, including
+    ties straddling the k-th place.
+    """
+    key = np.asarray(key, dtype=float)
+    k = min(int(k), len(key))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    if k < len(key):
+        threshold = np.partition(key, len(key) - k)[len(key) - k]
+        above = np.flatnonzero(key > threshold)
+        picked = np.concatenate([above, np.flatnonzero(key == threshold)[: k - len(above)]])
+    else:
+        picked = np.arange(len(key))
+    return picked[np.argsort(-key[picked], kind="stable")]
+
+
+def rank_features(means, raw_stds, latest, trend_for, top_k=3):
+    # Only the top-k columns are selected and described, so wide tables pay O(columns), not a full sort.
+    columns = means.index
+    mean_values = means.to_numpy(dtype=float)
+    latest_values = latest.to_numpy(dtype=float)
+    stds = raw_stds.to_numpy(dtype=float)
+    stds = np.where(stds == 0, 1e-9, stds)
+    z_scores = np.abs(latest_values - mean_values) / (stds + 1e-9)
+    # NaN scores sort last, in column order.
+    nan_rank = -1.0 - np.arange(len(columns)) / (len(columns) + 1.0)
+    key = np.where(np.isnan(z_scores), nan_rank, z_scores)
+    top_features = []
+    signals = []
+    for idx in top_k_indices(key, top_k):
+        feature = columns[idx]
+        deviation = float(round(z_scores[idx], 2))
+        direction = "above" if latest_values[idx] >= mean_values[idx] else "below"
+        detail, signal = describe_feature(feature, deviation, direction, trend_for(feature))
+        top_features.append(detail)
+        signals.append(signal)
+
+    if not signals:
+        signals = ["statistical deviation detected"]
+    return top_features, signals
+
+
+def score_rows(filled, detector=None, registry=None, feed=None, baseline_rows=None):
+    """Fits (or reuses) a detector on the baseline window and scores every row.
+
+    Returns the per-row decision scores and a cost block for the response.
+    """
+    mode = select_detector(detector, len(filled))
+    cost = {"name": mode, "fit_ms": 0.0, "score_ms": 0.0, "cached": False}
+    # Only the baseline window is used for fitting; every row is scored against it.
+    baseline = filled if baseline_rows is None else filled.head(max(2, int(baseline_rows)))
+    with stage("fit"):
+        if registry is None:
+            model = fit_detector(mode, baseline)
+            cost["fit_ms"] = model.fit_ms
+        else:
+            fitted = []
+
+            def fit():
+                fitted.append(mode)
+                return fit_detector(mode, baseline)
+
+            model = registry.get_or_fit(schema_key(filled.columns, baseline_rows, feed, mode), fit)
+            cost["fit_ms"] = model.fit_ms if fitted else 0.0
+            cost["cached"] = not fitted
+    with stage("score"):
+        start = time.perf_counter()
         scores = model.decision_function(filled)
-        score_min, score_max = scores.min(), scores.max()
-        if score_max == score_min:
-            normalized_score = 0.5
+        cost["score_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return scores, cost
+
+
+ROW_SCORE_MODES = ("page", "binary")
+ROW_CONTRIBUTIONS = 5
+
+
+def row_report(numeric, scores, means, raw_stds, top_rows=0, row_scores=None, row_offset=0, row_limit=1000):
+    """Per-row scores and the most anomalous rows with their feature contributions.
+
+    Lower decision scores are more anomalous. The top rows come from a partial
+    selection (argpartition) rather than a full sort, and the per-row scores are
+    returned as one page, either as a JSON list or base64 float32 (little-endian).
+    """
+    report = {"rows": len(scores)}
+    if top_rows:
+        k = min(int(top_rows), len(scores))
+        candidates = np.argpartition(scores, k - 1)[:k]
+        ranked = candidates[np.argsort(scores[candidates], kind="stable")]
+        values = numeric.to_numpy()[ranked].astype(float)
+        centre = means.to_numpy(dtype=float)
+        spread = raw_stds.replace(0, 1e-9).to_numpy(dtype=float) + 1e-9
+        deviations = np.abs(values - centre) / spread
+        columns = list(numeric.columns)
+        width = min(ROW_CONTRIBUTIONS, len(columns))
+        top_anomalies = []
+        for row_idx, row_dev in zip(ranked, deviations):
+            ranked_cols = np.argsort(-np.nan_to_num(row_dev, nan=-1.0), kind="stable")[:width]
+            top_anomalies.append({
+                "row": int(row_idx),
+                "score": round(float(scores[row_idx]), 6),
+                "contributions": {columns[col]: round(float(row_dev[col]), 2) for col in ranked_cols}
+            })
+        report["top_anomalies"] = top_anomalies
+
+    if row_scores:
+        if row_scores not in ROW_SCORE_MODES:
+            raise ValueError(f"Unknown row_scores mode '{row_scores}'. Choose one of: {', '.join(ROW_SCORE_MODES)}")
+        start = max(0, int(row_offset))
+        page = np.asarray(scores[start:start + max(0, int(row_limit))])
+        block = {"offset": start, "count": len(page), "next_offset": start + len(page) if start + len(page) < len(scores) else None}
+        if row_scores == "binary":
+            block["encoding"] = "base64-float32-le"
+            block["data"] = base64.b64encode(page.astype("<f4").tobytes()).decode("ascii")
         else:
-            normalized_score = float(np.clip((score_max - scores.mean()) / (score_max - score_min + 1e-9), 0.0, 1.0))
+            block["scores"] = [round(float(value), 6) for value in page]
+        report["scores"] = block
+    return report
+
+
+def _block_stats(block):
+    # Same two-pass, NaN-skipping mean and sample std that pandas uses, per column of the block.
+    mask = np.isnan(block)
+    missing = mask.any(axis=0)
+    count = len(block) - mask.sum(axis=0)
+    clean = np.where(mask, 0.0, block) if missing.any() else block
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = clean.sum(axis=0, dtype=np.float64) / count
+        squares = (mean - clean) ** 2
+        if missing.any():
+            squares[mask] = 0.0
+        std = np.where(count > 1, np.sqrt(squares.sum(axis=0, dtype=np.float64) / (count - 1)), np.nan)
+    return mean, std, count, mask, missing
+
+
+def _risk(filled, detector=None, registry=None, feed=None, baseline_rows=None):
+    if len(filled) >= 2:
+        scores, cost = score_rows(filled, detector, registry, feed, baseline_rows)
+        normalized_score = normalize_scores(scores.min(), scores.max(), scores.mean())
     else:
         # Not enough history for the model; stay neutral.
         normalized_score = 0.5
         scores = np.array([0.0])
+        cost = {"name": select_detector(detector, len(filled)), "fit_ms": 0.0, "score_ms": 0.0, "cached": False}
+    cost["input_bytes"] = int(filled.to_numpy().nbytes)
+    return scores, cost, normalized_score
+
+
+def risk_score(df, detector=None):
+    """The normalised detector score ``detect_anomalies`` would give ``df``, without its feature statistics.
+
+    Returns ``(risk_score, cost)``; ``cost`` is None when there are no numeric columns.
+    """
+    with stage("prepare"):
+        filled, _, _ = prepare_matrix(df)
+    if filled.empty:
+        return 0.0, None
+    _, cost, normalized_score = _risk(filled, detector)
+    return normalized_score, cost
+
+
+def prepare_matrix(df, dtype=None):
+    """Numeric columns as one C-contiguous matrix, median-filled in place.
+
+    Columns are converted into a preallocated ``dtype`` matrix that the
+    detector, statistics and row report all share, a block of columns at a
+    time: one column per block for tall uploads, many for wide ones, so
+    temporaries stay near ``PREPARE_BLOCK_CELLS``. Means, stds and latest
+    values come from the original values before NaNs are filled, so they match
+    the pandas statistics. Columns with no values are dropped.
+    """
+    dtype = PREPARE_DTYPE if dtype is None else np.dtype(dtype)
+    numeric = df.select_dtypes(include="number")
+    rows, width = numeric.shape
+    matrix = np.empty((rows, width), dtype=dtype)
+    stats = {name: np.empty(width) for name in ("mean", "std", "latest")}
+    present = np.ones(width, dtype=bool)
+    step = max(1, PREPARE_BLOCK_CELLS // max(rows, 1))
+    for start in range(0, width, step):
+        stop = min(start + step, width)
+        # Single float64 columns come back as views; wider or other blocks cost one temporary.
+        block = numeric.iloc[:, start:stop].to_numpy(dtype=np.float64, na_value=np.nan)
+        mean, std, count, mask, missing = _block_stats(block)
+        stats["mean"][start:stop] = mean
+        stats["std"][start:stop] = std
+        stats["latest"][start:stop] = block[-1] if rows else np.nan
+        present[start:stop] = count > 0
+        matrix[:, start:stop] = block
+        if missing.any():
+            holes = np.flatnonzero(missing & (count > 0))
+            for offset in holes:
+                column = matrix[:, start + offset]
+                column[mask[:, offset]] = np.nanmedian(block[:, offset])
+
+    columns = numeric.columns
+    positions = np.flatnonzero(present)
+    if len(positions) < width:
+        # take() keeps the result C-contiguous; boolean column indexing would not.
+        matrix = np.take(matrix, positions, axis=1)
+        columns = columns[positions]
+        stats = {name: value[positions] for name, value in stats.items()}
+
+    def raw_column(feature):
+        # Unfilled values of one kept column, for the few features that need trends.
+        return numeric.iloc[:, positions[columns.get_loc(feature)]]
 
-    means = numeric.mean()
-    raw_stds = numeric.std()
-    stds = raw_stds.replace(0, 1e-9)
-    latest = numeric.iloc[-1]
+    frame = pd.DataFrame(matrix, columns=columns, copy=False)
+    series = {name: pd.Series(value, index=columns) for name, value in stats.items()}
+    return frame, series, raw_column
 
-    def build_trend_hint(series):
-        window = min(5, max(2, len(series) // 2))
+
+def detect_anomalies(df, registry=None, feed=None, baseline_rows=None, detector=None,
+                     top_rows=0, row_scores=None, row_offset=0, row_limit=1000, include_stats=True):
+    """Scores ``df`` and summarises its most deviating features.
+
+    Per-column ``mean``/``std`` maps are only built with ``include_stats``;
+    the pipeline does not need them, and on tables with thousands of metric
+    columns they cost more than the ranking itself.
+    """
+    with stage("prepare"):
+        filled, stats, raw_column = prepare_matrix(df)
+        if filled.empty:
+            # Fallback when no numeric columns exist
+            return {"mean": {}, "std": {}, "signals": ["no numeric fields detected"], "top_features": []}, 0.0
+
+    scores, cost, normalized_score = _risk(filled, detector, registry, feed, baseline_rows)
+
+    with stage("stats"):
+        means = stats["mean"]
+        raw_stds = stats["std"]
+        latest = stats["latest"]
+
+    def build_trend_hint(feature):
+        # Only called for the selected top-k features.
+        series = raw_column(feature)
+        window = trend_window(len(series))
         if len(series) < window * 2:
             return "trend unclear"
-        recent_mean = series.tail(window).mean()
-        prior_mean = series.head(window).mean()
-        delta = recent_mean - prior_mean
-        if abs(delta) <= series.std() * 0.2:
-            return "stable"
-        return "increasing" if delta > 0 else "decreasing"
-
-    z_scores = ((latest - means).abs() / (stds + 1e-9)).sort_values(ascending=False)
-    top_features = []
-    signals = []
-    for feature in z_scores.head(3).index:
-        deviation = float(round(z_scores[feature], 2))
-        direction = "above" if latest[feature] >= means[feature] else "below"
-        trend_hint = build_trend_hint(numeric[feature])
-        detail = {
-            "feature": feature,
-            "deviation_sigma": deviation,
-            "direction": direction,
-            "trend": trend_hint
-        }
-        top_features.append(detail)
-        signals.append(f"{feature} running {direction} baseline ({deviation}σ) with {trend_hint} trend")
+        return trend_label(series.head(window).mean(), series.tail(window).mean(), raw_stds[feature])
 
-    if not signals:
-        signals = ["statistical deviation detected"]
+    with stage("rank"):
+        top_features, signals = rank_features(means, raw_stds, latest, build_trend_hint)
+
+    rows = None
+    if (top_rows or row_scores) and len(filled) >= 2:
+        with stage("rows"):
+            rows = row_report(filled, scores, means, raw_stds, top_rows, row_scores, row_offset, row_limit)
 
-    summary = {
-        "mean": means.to_dict(),
-        "std": raw_stds.to_dict(),
+    summary = {"mean": means.to_dict(), "std": raw_stds.to_dict()} if include_stats else {}
+    summary.update({
         "signals": signals,
         "top_features": top_features,
-        "risk_score": normalized_score
-    }
+        "risk_score": normalized_score,
+        "detector": cost
+    })
+    if rows is not None:
+        summary["rows"] = rows
     return summary, normalized_score
\ No newline at end of file
@@ -0,0 +1,273 @@
+import bisect
+import json
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from .agents import LEVELS
+
+STATUSES = ["COMPLETED", "DEFERRED"]
+STATUS_INDEX = {status: idx for idx, status in enumerate(STATUSES)}
+LEVEL_CODES = {level: idx for idx, level in enumerate(LEVELS)}
+
+DIRECTIONS = ["", "above", "below"]
+TRENDS = ["", "increasing", "decreasing", "stable", "trend unclear"]
+DIRECTION_CODES = {direction: idx for idx, direction in enumerate(DIRECTIONS)}
+TREND_CODES = {trend: idx for idx, trend in enumerate(TRENDS)}
+
+# ts, feed, mission, action, primary signal, risk level, mission status, direction, trend, confidence, sigma.
+RECORD = struct.Struct("<dIIIIBBBBff")
+NO_STRING = 0
+
+# Feature signals (see anomaly.describe_feature) embed their deviation, so only the feature name is interned.
+_FEATURE_SIGNAL = re.compile(r"^(?P<feature>.+) running (?P<direction>above|below) baseline "
+                             r"\((?P<sigma>[^()]+)σ\) with (?P<trend>.+) trend$")
+
+
+def _split_signal(signal):
+    # Returns (text to intern, direction code, trend code, sigma); free-text signals are kept whole.
+    match = _FEATURE_SIGNAL.match(signal or "")
+    if match is None or match["trend"] not in TREND_CODES:
+        return signal, 0, 0, 0.0
+    try:
+        sigma = float(match["sigma"])
+    except ValueError:
+        return signal, 0, 0, 0.0
+    return match["feature"], DIRECTION_CODES[match["direction"]], TREND_CODES[match["trend"]], sigma
+
+
+class DecisionRecord:
+    """One audited decision; strings are held as codes into the log's string table."""
+
+    __slots__ = ("ts", "feed", "mission", "action", "signal", "risk", "status", "direction", "trend",
+                 "confidence", "sigma")
+
+    def __init__(self, ts, feed, mission, action, signal, risk, status, confidence,
+                 direction=0, trend=0, sigma=0.0):
+        self.ts = ts
+        self.feed = feed
+        self.mission = mission
+        self.action = action
+        self.signal = signal
+        self.risk = risk
+        self.status = status
+        self.direction = direction
+        self.trend = trend
+        self.confidence = confidence
+        self.sigma = sigma
+
+    def pack(self):
+        return RECORD.pack(self.ts, self.feed, self.mission, self.action, self.signal,
+                           self.risk, self.status, self.direction, self.trend, self.confidence, self.sigma)
+
+    @classmethod
+    def unpack(cls, payload, offset=0):
+        ts, feed, mission, action, signal, risk, status, direction, trend, confidence, sigma = \
+            RECORD.unpack_from(payload, offset)
+        return cls(ts, feed, mission, action, signal, risk, status, confidence, direction, trend, sigma)
+
+
+class AuditLog:
+    """Append-only decision log with feed, risk level and time indexes.
+
+    Records are fixed-size structs in ``records-v2.bin``; repeated text (feeds,
+    missions, actions, signal features) is interned once in ``strings.jsonl``.
+    A feature signal's deviation, direction and trend live in the record, so
+    the string table stays bounded by the distinct features and messages. Both
+    files are only ever appended to under an exclusive lock, so several worker
+    processes can share one directory; each refreshes its indexes from the
+    file tail before answering a query.
+    """
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self._records_path = os.path.join(self.root, "records-v2.bin")
+        self._strings_path = os.path.join(self.root, "strings.jsonl")
+        self._lock_path = os.path.join(self.root, ".lock")
+        self._lock = threading.Lock()
+        # Code 0 is reserved for "no value".
+        self._strings = [""]
+        self._codes = {"": NO_STRING}
+        self._strings_offset = 0
+        self._records_offset = 0
+        self._times = array("d")
+        self._by_risk = {code: array("I") for code in range(len(LEVELS))}
+        self._by_feed = {}
+        with self._lock:
+            self._sync()
+
+    def __len__(self):
+        return len(self._times)
+
+    @contextmanager
+    def _file_lock(self):
+        with open(self._lock_path, "a+") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+                yield
+                return
+            # msvcrt locks a byte range and gives up after ~10 s, so keep retrying on byte 0.
+            handle.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _sync(self):
+        # Picks up strings and records appended by this or any other process.
+        if os.path.exists(self._strings_path):
+            with open(self._strings_path, "rb") as fh:
+                fh.seek(self._strings_offset)
+                for line in fh:
+                    if not line.endswith(b"\n"):
+                        break
+                    self._strings_offset += len(line)
+                    text = json.loads(line)
+                    self._codes[text] = len(self._strings)
+                    self._strings.append(text)
+        if os.path.exists(self._records_path):
+            with open(self._records_path, "rb") as fh:
+                fh.seek(self._records_offset)
+                payload = fh.read()
+            usable = len(payload) - len(payload) % RECORD.size
+            for offset in range(0, usable, RECORD.size):
+                self._index(DecisionRecord.unpack(payload, offset))
+            self._records_offset += usable
+
+    def _index(self, record):
+        position = len(self._times)
+        self._times.append(record.ts)
+        self._by_risk.setdefault(record.risk, array("I")).append(position)
+        self._by_feed.setdefault(record.feed, array("I")).append(position)
+
+    def _intern(self, text, pending):
+        if not text:
+            return NO_STRING
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self._strings)
+            self._strings.append(text)
+            pending.append(text)
+        return code
+
+    def append(self, decision, feed: str | None = None, ts: float | None = None):
+        risk = LEVEL_CODES.get(decision.get("risk_level"))
+        if risk is None:
+            return None
+        signals = decision.get("signals") or []
+        signal, direction, trend, sigma = _split_signal(signals[0] if signals else None)
+        with self._lock, self._file_lock():
+            self._sync()
+            pending = []
+            record = DecisionRecord(
+                # Timestamps never go backwards, so the time index stays sorted.
+                max(time.time() if ts is None else ts, self._times[-1] if self._times else 0.0),
+                self._intern(feed, pending),
+                self._intern(decision.get("mission_brief"), pending),
+                self._intern(decision.get("recommended_action"), pending),
+                self._intern(signal, pending),
+                risk,
+                STATUS_INDEX.get(decision.get("mission_status"), 0),
+                float(decision.get("confidence") or 0.0),
+                direction,
+                trend,
+                sigma
+            )
+            if pending:
+                lines = "".join(json.dumps(text) + "\n" for text in pending).encode("utf-8")
+                with open(self._strings_path, "ab") as fh:
+                    fh.write(lines)
+                self._strings_offset += len(lines)
+            with open(self._records_path, "ab") as fh:
+                fh.write(record.pack())
+            self._records_offset += RECORD.size
+            self._index(record)
+        return record
+
+    def _positions(self, feed, risk_level, since, until):
+        lo = 0 if since is None else bisect.bisect_left(self._times, since)
+        hi = len(self._times) if until is None else bisect.bisect_right(self._times, until)
+        candidates = None
+        if feed is not None:
+            candidates = self._by_feed.get(self._codes.get(feed, -1), array("I"))
+        if risk_level is not None:
+            by_risk = self._by_risk.get(LEVEL_CODES.get(risk_level, -1), array("I"))
+            if candidates is None or len(by_risk) < len(candidates):
+                other, candidates = candidates, by_risk
+            else:
+                other = by_risk
+        else:
+            other = None
+        if candidates is None:
+            return range(lo, hi)
+        # Postings are sorted by position, so the time range is a slice of each list.
+        candidates = candidates[bisect.bisect_left(candidates, lo):bisect.bisect_left(candidates, hi)]
+        if other is None:
+            return candidates
+        wanted = set(other[bisect.bisect_left(other, lo):bisect.bisect_left(other, hi)])
+        return [position for position in candidates if position in wanted]
+
+    def query(self, feed: str | None = None, risk_level: str | None = None,
+              since: float | None = None, until: float | None = None, limit: int = 100):
+        """Newest-first decisions matching every given filter."""
+        with self._lock:
+            self._sync()
+            positions = self._positions(feed, risk_level, since, until)
+            total = len(positions)
+            selected = list(positions[max(0, total - limit):])[::-1] if limit else []
+            records = []
+            if selected:
+                with open(self._records_path, "rb") as fh:
+                    for position in selected:
+                        fh.seek(position * RECORD.size)
+                        records.append(DecisionRecord.unpack(fh.read(RECORD.size)))
+            return total, [self.expand(record) for record in records]
+
+    def expand(self, record):
+        strings = self._strings
+        signal = strings[record.signal] or None
+        sigma = None
+        if record.direction:
+            # Rounded like describe_feature, so the float32 field prints as the original signal.
+            sigma = round(record.sigma, 2)
+            signal = f"{signal} running {DIRECTIONS[record.direction]} baseline ({sigma}σ) with {TRENDS[record.trend]} trend"
+        return {
+            "ts": record.ts,
+            "feed": strings[record.feed] or None,
+            "risk_level": LEVELS[record.risk],
+            "recommended_action": strings[record.action],
+            "confidence": round(record.confidence, 4),
+            "signal": signal,
+            "deviation_sigma": sigma,
+            "mission_brief": strings[record.mission],
+            "mission_status": STATUSES[record.status]
+        }
+
+    def stats(self):
+        with self._lock:
+            self._sync()
+            return {
+                "records": len(self._times),
+                "bytes": self._records_offset,
+                "strings": len(self._strings) - 1,
+                "by_risk_level": {LEVELS[code]: len(postings) for code, postings in self._by_risk.items()},
+                "feeds": len(self._by_feed)
+            }
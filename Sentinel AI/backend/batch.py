@@ -0,0 +1,156 @@
+import io
+import multiprocessing
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .anomaly import risk_score
+from .fleet import detect_fleet, stack_feeds
+from .ingest import FORMATS, IngestError, detect_format, read_table
+from .metrics import collect_timings, record_fallback, stage
+from .pipeline import SAFE_FALLBACK, decide_batch, run_pipeline
+
+ARCHIVE_SUFFIXES = (".zip",)
+FEED_SUFFIXES = tuple(FORMATS)
+
+
+def default_workers():
+    return max(1, int(os.environ.get("SENTINEL_BATCH_WORKERS", "0")) or os.cpu_count() or 1)
+
+
+def create_pool(max_workers: int | None = None):
+    # Forking the server while the warm-up thread holds an import lock deadlocks the children,
+    # so workers come from a clean single-threaded forkserver where the platform has one.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else None)
+    return ProcessPoolExecutor(max_workers=max_workers or default_workers(), mp_context=context)
+
+
+def _feed_name(filename):
+    base = os.path.basename(filename or "feed")
+    for suffix in FEED_SUFFIXES:
+        if base.lower().endswith(suffix):
+            return base[: -len(suffix)]
+    return base
+
+
+def expand_upload(filename, data, content_type=None):
+    # A multi-feed archive contributes one feed per supported member; anything else is a single feed.
+    if (filename or "").lower().endswith(ARCHIVE_SUFFIXES):
+        try:
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                return [
+                    (_feed_name(info.filename), archive.read(info), detect_format(info.filename))
+                    for info in archive.infolist()
+                    if not info.is_dir() and info.filename.lower().endswith(FEED_SUFFIXES)
+                ]
+        except zipfile.BadZipFile as e:
+            raise IngestError(f"Failed to read archive {filename}: {e}") from e
+    return [(_feed_name(filename), data, detect_format(filename, content_type))]
+
+
+def unique_feeds(pairs):
+    feeds = {}
+    for name, data, fmt in pairs:
+        key = name
+        suffix = 2
+        while key in feeds:
+            key = f"{name}-{suffix}"
+            suffix += 1
+        feeds[key] = (data, fmt)
+    return feeds
+
+
+def analyze_feed(name, data, mission: str | None = None, detector: str | None = None, fmt: str = "csv"):
+    # Runs inside a worker process; takes raw bytes so only the upload crosses the process boundary.
+    start = time.perf_counter()
+    with collect_timings() as timings:
+        try:
+            df = read_table(io.BytesIO(data), fmt)
+        except IngestError as e:
+            result = {"error": str(e)}
+        else:
+            result = run_pipeline(df, mission=mission, detector=detector)
+    return name, result, round((time.perf_counter() - start) * 1000, 2), timings
+
+
+def score_feed(name, data, detector: str | None = None, fmt: str = "csv"):
+    # Fleet mode: the worker only parses and scores; feature statistics are computed for all feeds at once.
+    start = time.perf_counter()
+    numeric, score, cost, error = None, None, None, None
+    with collect_timings() as timings:
+        try:
+            df = read_table(io.BytesIO(data), fmt)
+        except IngestError as e:
+            error = str(e)
+        else:
+            numeric = df.select_dtypes(include="number")
+            try:
+                score, cost = risk_score(df, detector)
+            except Exception:
+                record_fallback("detect")
+    return name, numeric, score, cost, error, round((time.perf_counter() - start) * 1000, 2), timings
+
+
+def failed_feed(name, error, fleet: bool = False):
+    # Outcome for a feed whose worker never returned, shaped like score_feed or analyze_feed.
+    if fleet:
+        return name, None, None, None, error, 0.0, {}
+    return name, {"error": error}, 0.0, {}
+
+
+def decide_fleet(scored, mission: str | None = None):
+    """Decisions for ``score_feed`` outcomes from one vectorised statistics pass over the whole fleet
+    and one batched risk/action pass (``decide_batch``).
+
+    Returns ``(name, result, elapsed_ms, timings)`` tuples like ``analyze_feed``.
+    """
+    ready = [outcome for outcome in scored if outcome[1] is not None and outcome[2] is not None]
+    with stage("fleet"):
+        stacked, columns, lengths = stack_feeds([outcome[1] for outcome in ready])
+        summaries = detect_fleet(stacked, columns, lengths, risk_scores=[outcome[2] for outcome in ready])
+    for (_, _, _, cost, _, _, _), summary in zip(ready, summaries):
+        if cost:
+            summary["detector"] = cost
+    decisions = decide_batch(summaries, [outcome[2] for outcome in ready], mission=mission)
+    by_name = {outcome[0]: decision for outcome, decision in zip(ready, decisions)}
+
+    outcomes = []
+    for name, _, _, _, error, elapsed, timings in scored:
+        if error is not None:
+            result = {"error": error}
+        else:
+            result = by_name.get(name) or SAFE_FALLBACK.copy()
+        outcomes.append((name, result, elapsed, timings))
+    return outcomes
+
+
+def summarize_batch(outcomes, wall_ms, workers):
+    decisions = {}
+    feed_ms = {}
+    risk_counts = {}
+    errors = 0
+    for name, result, elapsed, _ in outcomes:
+        decisions[name] = result
+        feed_ms[name] = elapsed
+        if "error" in result:
+            errors += 1
+            continue
+        level = result.get("risk_level", "MEDIUM")
+        risk_counts[level] = risk_counts.get(level, 0) + 1
+
+    busy_ms = sum(feed_ms.values())
+    return {
+        "feeds": decisions,
+        "risk_counts": risk_counts,
+        "timing": {
+            "feeds": len(decisions),
+            "errors": errors,
+            "workers": workers,
+            "wall_ms": round(wall_ms, 2),
+            "feed_ms_total": round(busy_ms, 2),
+            "feed_ms": feed_ms,
+            "parallel_speedup": round(busy_ms / wall_ms, 2) if wall_ms > 0 else None
+        }
+    }
@@ -0,0 +1,123 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def hash_upload(fileobj, chunk_size: int = HASH_CHUNK_BYTES):
+    # Streams the upload through sha256 and rewinds it so it can still be parsed.
+    digest = hashlib.sha256()
+    fileobj.seek(0)
+    while True:
+        block = fileobj.read(chunk_size)
+        if not block:
+            break
+        digest.update(block if isinstance(block, bytes) else block.encode("utf-8"))
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def result_key(upload_digest, mission, **options):
+    parts = [upload_digest, (mission or "").strip()]
+    parts.extend(f"{name}={options[name]}" for name in sorted(options))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Bounded TTL + LRU cache of pipeline decisions.
+
+    With a shared ``store`` a local miss falls through to results cached by
+    other worker processes; entries there expire after the same TTL.
+    """
+
+    def __init__(self, capacity: int = 256, ttl_seconds: float = 300.0, store=None):
+        self.capacity = max(0, int(capacity))
+        self.ttl_seconds = ttl_seconds
+        self.store = store
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0
+
+    @property
+    def enabled(self):
+        return self.capacity > 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is None:
+            # Store reads may hit disk or the network; other lookups should not wait on them.
+            shared = self._load(key)
+            with self._lock:
+                if shared is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+                self.shared_hits += 1
+                self._remember(key, shared)
+            return copy.deepcopy(shared)
+        # Callers may decorate the result (timings, headers); never hand out the stored dict.
+        return copy.deepcopy(entry[1])
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+        stored = copy.deepcopy(value)
+        with self._lock:
+            self._remember(key, stored)
+        if self.store is not None:
+            self.store.set(f"result:{key}", json.dumps(stored).encode("utf-8"), ttl=self.ttl_seconds)
+
+    def _load(self, key):
+        if self.store is None:
+            return None
+        payload = self.store.get(f"result:{key}")
+        if payload is None:
+            return None
+        try:
+            return json.loads(payload)
+        except ValueError:
+            return None
+
+    def _remember(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "shared_hits": self.shared_hits,
+                "store": type(self.store).__name__ if self.store is not None else None
+            }
@@ -0,0 +1,152 @@
+import numpy as np
+
+from .anomaly import describe_feature
+
+TREND_BUFFER = 5
+
+
+def stack_feeds(frames):
+    """Stack per-feed DataFrames into a feeds x rows x metrics float array.
+
+    Columns are the union of numeric columns in first-seen order; shorter feeds
+    and missing columns are padded with NaN. Returns ``(array, columns, lengths)``.
+    """
+    numeric = [frame.select_dtypes(include="number") for frame in frames]
+    columns = []
+    seen = set()
+    for frame in numeric:
+        for column in frame.columns:
+            if column not in seen:
+                seen.add(column)
+                columns.append(column)
+
+    lengths = np.array([len(frame) for frame in numeric], dtype=np.int64)
+    rows = int(lengths.max()) if len(lengths) else 0
+    stacked = np.full((len(numeric), rows, len(columns)), np.nan)
+    for idx, frame in enumerate(numeric):
+        if len(frame):
+            stacked[idx, : len(frame), :] = frame.reindex(columns=columns).to_numpy(dtype=float)
+    return stacked, columns, lengths
+
+
+def _masked_mean(values, mask):
+    counts = mask.sum(axis=1)
+    sums = np.where(mask, values, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan), counts
+
+
+def fleet_statistics(stacked, lengths=None, top_k=3):
+    """Vectorised equivalent of the per-feed statistics in ``detect_anomalies``.
+
+    Every quantity is computed for all feeds at once; the result holds arrays
+    indexed by feed (and metric), plus the ranked top-k metric indices.
+    """
+    feeds, rows, metrics = stacked.shape
+    if lengths is None:
+        lengths = np.full(feeds, rows, dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)
+
+    valid = ~np.isnan(stacked)
+    means, counts = _masked_mean(stacked, valid)
+    deviations = np.where(valid, stacked - means[:, None, :], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        raw_stds = np.sqrt(np.where(counts > 1, (deviations ** 2).sum(axis=1) / (counts - 1), np.nan))
+
+    last_index = np.maximum(lengths - 1, 0)
+    latest = stacked[np.arange(feeds), last_index, :]
+
+    # Trend windows are at most five rows, so only the head and tail slices are touched.
+    window = np.minimum(TREND_BUFFER, np.maximum(2, lengths // 2))
+    offsets = np.arange(TREND_BUFFER)
+    head = stacked[:, :TREND_BUFFER, :]
+    head_mask = ~np.isnan(head) & (offsets[: head.shape[1]][None, :] < window[:, None])[:, :, None]
+    prior, _ = _masked_mean(head, head_mask)
+
+    tail_index = lengths[:, None] - TREND_BUFFER + offsets[None, :]
+    tail_in_window = (tail_index >= (lengths - window)[:, None]) & (tail_index >= 0)
+    tail = np.take_along_axis(stacked, np.clip(tail_index, 0, max(rows - 1, 0))[:, :, None], axis=1)
+    recent, _ = _masked_mean(tail, ~np.isnan(tail) & tail_in_window[:, :, None])
+
+    delta = recent - prior
+    with np.errstate(invalid="ignore"):
+        stable = np.abs(delta) <= raw_stds * 0.2
+        increasing = delta > 0
+    unclear = (lengths < window * 2)[:, None]
+
+    stds = np.where(raw_stds == 0, 1e-9, raw_stds)
+    z_scores = np.abs(latest - means) / (stds + 1e-9)
+    with np.errstate(invalid="ignore"):
+        above = latest >= means
+
+    # pandas sorts NaN last in column order; columns that are entirely empty drop out before ranking.
+    present = counts > 0
+    nan_rank = -1.0 - np.arange(metrics) / (metrics + 1.0)
+    rank_key = np.where(present, np.where(np.isnan(z_scores), nan_rank, z_scores), -2.0)
+    k = min(top_k, metrics)
+    if k:
+        candidates = np.argpartition(-rank_key, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(rank_key, candidates, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(candidates, order, axis=1)
+    else:
+        top = np.empty((feeds, 0), dtype=np.int64)
+
+    return {
+        "means": means,
+        "stds": raw_stds,
+        "present": present,
+        "latest": latest,
+        "z_scores": z_scores,
+        "above": above,
+        "stable": stable,
+        "increasing": increasing,
+        "unclear": unclear,
+        "top": top,
+        "top_valid": np.take_along_axis(present, top, axis=1)
+    }
+
+
+def detect_fleet(stacked, columns, lengths=None, top_k=3, risk_scores=None, include_stats=False):
+    """Per-feed summaries for a stacked fleet, compatible with ``analyst_agent``.
+
+    Risk scoring stays with the detector; pass ``risk_scores`` (one per feed) to
+    attach them. Full per-metric stats are only emitted with ``include_stats``.
+    """
+    stats = fleet_statistics(stacked, lengths, top_k)
+    summaries = []
+    for feed_idx in range(stacked.shape[0]):
+        present = stats["present"][feed_idx]
+        if not present.any():
+            summaries.append({"mean": {}, "std": {}, "signals": ["no numeric fields detected"], "top_features": []})
+            continue
+
+        top_features = []
+        signals = []
+        for metric_idx, valid in zip(stats["top"][feed_idx], stats["top_valid"][feed_idx]):
+            if not valid:
+                continue
+            feature = columns[metric_idx]
+            deviation = float(round(stats["z_scores"][feed_idx, metric_idx], 2))
+            direction = "above" if stats["above"][feed_idx, metric_idx] else "below"
+            if stats["unclear"][feed_idx, 0]:
+                trend_hint = "trend unclear"
+            elif stats["stable"][feed_idx, metric_idx]:
+                trend_hint = "stable"
+            else:
+                trend_hint = "increasing" if stats["increasing"][feed_idx, metric_idx] else "decreasing"
+            detail, signal = describe_feature(feature, deviation, direction, trend_hint)
+            top_features.append(detail)
+            signals.append(signal)
+
+        if not signals:
+            signals = ["statistical deviation detected"]
+
+        summary = {"signals": signals, "top_features": top_features}
+        if include_stats:
+            kept = [idx for idx in range(len(columns)) if present[idx]]
+            summary["mean"] = {columns[idx]: float(stats["means"][feed_idx, idx]) for idx in kept}
+            summary["std"] = {columns[idx]: float(stats["stds"][feed_idx, idx]) for idx in kept}
+        if risk_scores is not None:
+            summary["risk_score"] = float(risk_scores[feed_idx])
+        summaries.append(summary)
+    return summaries
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+# Rows per parsed batch on the chunked path; peak memory scales with this, not the upload.
+CHUNK_ROWS = 50_000
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".npy": "npy"
+}
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+    "application/vnd.apache.arrow.file": "arrow",
+    "application/vnd.apache.arrow.stream": "arrow"
+}
+
+
+class IngestError(ValueError):
+    pass
+
+
+def detect_format(filename=None, content_type=None, override=None):
+    if override:
+        fmt = override.lower().lstrip(".")
+        if fmt not in set(FORMATS.values()):
+            raise IngestError(f"Unsupported format '{override}'. Choose one of: {', '.join(sorted(set(FORMATS.values())))}")
+        return fmt
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if suffix in FORMATS:
+        return FORMATS[suffix]
+    return CONTENT_TYPES.get((content_type or "").split(";")[0].strip(), "csv")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise IngestError("Parquet/Arrow ingestion requires the pyarrow package") from e
+    return pyarrow
+
+
+class _LocalFile:
+    # Memory mapping needs a real path; uploads that only exist as file objects are spooled to disk once.
+    def __init__(self, source):
+        self.source = source
+        self.path = None
+        self._temp = None
+
+    def __enter__(self):
+        if isinstance(self.source, (str, os.PathLike)):
+            self.path = os.fspath(self.source)
+            return self.path
+        handle, self._temp = tempfile.mkstemp(prefix="sentinel-", suffix=".bin")
+        with os.fdopen(handle, "wb") as out:
+            if hasattr(self.source, "seek"):
+                self.source.seek(0)
+            shutil.copyfileobj(self.source, out)
+        self.path = self._temp
+        return self.path
+
+    def __exit__(self, *exc):
+        # Open memory maps stay valid after unlink on POSIX, so frames can outlive the temp file.
+        if self._temp:
+            try:
+                os.unlink(self._temp)
+            except OSError:
+                pass
+
+
+def _numeric_fields(schema):
+    pa = _pyarrow()
+    return [
+        field.name for field in schema
+        if pa.types.is_integer(field.type) or pa.types.is_floating(field.type) or pa.types.is_decimal(field.type)
+    ]
+
+
+def _open_arrow(path):
+    pa = _pyarrow()
+    source = pa.memory_map(path, "r")
+    try:
+        return pa.ipc.open_file(source)
+    except pa.ArrowInvalid:
+        source.seek(0)
+        return pa.ipc.open_stream(source)
+
+
+def _arrow_to_frame(table):
+    # split_blocks avoids consolidating columns into one big copy.
+    return table.to_pandas(split_blocks=True)
+
+
+def _npy_frame(array):
+    if array.dtype.names:
+        names = [name for name in array.dtype.names if np.issubdtype(array.dtype[name], np.number)]
+        return pd.DataFrame({name: array[name] for name in names}, copy=False)
+    if array.ndim == 1:
+        array = array.reshape(-1, 1)
+    if not np.issubdtype(array.dtype, np.number):
+        raise IngestError("NumPy uploads must hold a numeric 2-D array or a structured array")
+    columns = [f"metric_{idx}" for idx in range(array.shape[1])]
+    return pd.DataFrame(array, columns=columns, copy=False)
+
+
+def read_table(source, fmt: str = "csv"):
+    try:
+        if fmt == "csv":
+            return pd.read_csv(source)
+        with _LocalFile(source) as path:
+            if fmt == "parquet":
+                pq = _pyarrow().parquet
+                parquet = pq.ParquetFile(path, memory_map=True)
+                columns = _numeric_fields(parquet.schema_arrow)
+                return _arrow_to_frame(parquet.read(columns=columns))
+            if fmt == "arrow":
+                reader = _open_arrow(path)
+                table = reader.read_all()
+                return _arrow_to_frame(table.select(_numeric_fields(table.schema)))
+            if fmt == "npy":
+                return _npy_frame(np.load(path, mmap_mode="r", allow_pickle=False))
+    except IngestError:
+        raise
+    except Exception as e:
+        raise IngestError(f"Failed to read {fmt.upper()}: {e}") from e
+    raise IngestError(f"Unsupported format '{fmt}'")
+
+
+def _columnar_chunks(path, fmt, chunk_rows):
+    if fmt == "parquet":
+        parquet = _pyarrow().parquet.ParquetFile(path, memory_map=True)
+        columns = _numeric_fields(parquet.schema_arrow)
+        for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    elif fmt == "arrow":
+        reader = _open_arrow(path)
+        columns = _numeric_fields(reader.schema)
+        batches = (reader.get_batch(idx) for idx in range(reader.num_record_batches)) \
+            if hasattr(reader, "num_record_batches") else reader
+        for batch in batches:
+            for offset in range(0, batch.num_rows, chunk_rows):
+                yield batch.slice(offset, chunk_rows).select(columns).to_pandas()
+    elif fmt == "npy":
+        frame = _npy_frame(np.load(path, mmap_mode="r", allow_pickle=False))
+        for offset in range(0, len(frame), chunk_rows):
+            yield frame.iloc[offset:offset + chunk_rows]
+    else:
+        raise IngestError(f"Unsupported format '{fmt}'")
+
+
+def iter_numeric_chunks(source, chunk_rows: int = CHUNK_ROWS, fmt: str = "csv"):
+    # Numeric columns are fixed by the first batch; later batches are projected onto them.
+    chunk_rows = max(1, int(chunk_rows))
+    try:
+        if fmt == "csv":
+            columns = None
+            for chunk in pd.read_csv(source, chunksize=chunk_rows):
+                if columns is None:
+                    columns = list(chunk.select_dtypes(include="number").columns)
+                yield chunk[columns]
+            return
+        with _LocalFile(source) as path:
+            yield from _columnar_chunks(path, fmt, chunk_rows)
+    except IngestError:
+        raise
+    except Exception as e:
+        raise IngestError(f"Failed to read {fmt.upper()}: {e}") from e
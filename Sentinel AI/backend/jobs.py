@@ -0,0 +1,155 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(RuntimeError):
+    pass
+
+
+class Job:
+    def __init__(self, job_id):
+        self.id = job_id
+        self.status = QUEUED
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.future = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self, include_result=True):
+        payload = {
+            "job_id": self.id,
+            "status": self.status,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+        if self.error:
+            payload["error"] = self.error
+        if include_result and self.status == DONE:
+            payload["result"] = self.result
+        return payload
+
+
+class JobQueue:
+    """Bounded worker pool for long-running analyses.
+
+    Submissions beyond ``max_pending`` queued-or-running jobs are rejected with
+    ``QueueFull`` so bursts apply backpressure instead of growing memory. Only the
+    most recent ``retain`` jobs are kept for polling. The worker pool is created on
+    first use and again after ``shutdown``, so the queue outlives an app lifespan.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 32, retain: int = 1024):
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self.retain = max(1, int(retain))
+        self._executor = None
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _run(self, job, fn, args, kwargs, cleanup):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+            if cleanup is not None:
+                cleanup()
+            with self._lock:
+                self._pending -= 1
+                if job.status == DONE:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+        return job
+
+    def _trim(self):
+        while len(self._jobs) > self.retain:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+
+    def submit(self, fn, *args, cleanup=None, **kwargs):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFull(f"Job queue is full ({self.max_pending} pending)")
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sentinel-job")
+            executor = self._executor
+            self._pending += 1
+            job = Job(uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            self._trim()
+        try:
+            job.future = executor.submit(self._run, job, fn, args, kwargs, cleanup)
+        except Exception:
+            # Nothing will run the job, so release its slot or the queue fills up for good.
+            with self._lock:
+                self._pending -= 1
+                self._jobs.pop(job.id, None)
+            raise
+        job.future.add_done_callback(lambda future: self._cancelled(job, cleanup) if future.cancelled() else None)
+        return job
+
+    def _cancelled(self, job, cleanup):
+        # Jobs cancelled by shutdown never reach _run, so settle them here.
+        job.error = "CancelledError: queue shut down"
+        job.status = FAILED
+        job.finished_at = time.time()
+        if cleanup is not None:
+            cleanup()
+        with self._lock:
+            self._pending -= 1
+            self.failed += 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def depth(self):
+        with self._lock:
+            return self._pending
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "tracked": len(self._jobs),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import time
+
+import pandas as pd
+
+from .ingest import IngestError
+
+
+def decision_key(risk_level, summary):
+    # Clients are only told about a feed again when its risk level or leading features change.
+    return risk_level, tuple(feature.get("feature") for feature in summary.get("top_features") or [])
+
+
+def parse_rows(message):
+    """Rows from one live frame: a JSON object, a list of objects or ``{"rows": [...]}``."""
+    try:
+        payload = json.loads(message)
+    except ValueError as e:
+        raise IngestError(f"Live frames must be JSON: {e}") from e
+    if isinstance(payload, dict):
+        payload = payload.get("rows", [payload])
+    if not isinstance(payload, list) or not all(isinstance(row, dict) for row in payload):
+        raise IngestError("Live frames must hold an object, a list of objects or {\"rows\": [...]}")
+    return pd.DataFrame.from_records(payload)
+
+
+class LiveFeed:
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.subscribers = set()
+        self.last_key = None
+        self.last_push = 0.0
+        self.pending = None
+        self.timer = None
+        self.pushed = 0
+        self.suppressed = 0
+
+
+class LiveHub:
+    """Per-feed fan-out of decisions to WebSocket and SSE subscribers.
+
+    ``publish`` drops decisions whose risk level and top features match the
+    last one sent, and sends at most one decision per ``debounce`` seconds per
+    feed; a change arriving inside the window is delivered when it closes, as
+    the latest decision at that point. Everything runs on the event loop, so
+    one worker can hold hundreds of feeds without a thread each.
+    """
+
+    def __init__(self, debounce: float = 1.0, queue_size: int = 8):
+        self.debounce = max(0.0, float(debounce))
+        self.queue_size = max(1, int(queue_size))
+        self._feeds = {}
+
+    def feed(self, name):
+        live = self._feeds.get(name)
+        if live is None:
+            live = self._feeds[name] = LiveFeed()
+        return live
+
+    def subscribe(self, name):
+        queue = asyncio.Queue(self.queue_size)
+        self.feed(name).subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, name, queue):
+        live = self._feeds.get(name)
+        if live is None:
+            return
+        live.subscribers.discard(queue)
+        if not live.subscribers:
+            if live.timer is not None:
+                live.timer.cancel()
+            del self._feeds[name]
+
+    def publish(self, name, decision, key):
+        live = self._feeds.get(name)
+        if live is None:
+            # Nobody is watching this feed.
+            return False
+        if key == live.last_key:
+            # Back to the state already sent; anything pending is now stale.
+            live.suppressed += 1 + (live.pending is not None)
+            live.pending = None
+            return False
+        wait = live.last_push + self.debounce - time.monotonic()
+        if wait <= 0:
+            self._push(name, live, decision, key)
+            return True
+        if live.pending is not None:
+            live.suppressed += 1
+        live.pending = (decision, key)
+        if live.timer is None:
+            live.timer = asyncio.get_running_loop().call_later(wait, self._flush, name, live)
+        return False
+
+    def _flush(self, name, live):
+        live.timer = None
+        if live.pending is not None:
+            decision, key = live.pending
+            self._push(name, live, decision, key)
+
+    def _push(self, name, live, decision, key):
+        live.pending = None
+        live.last_key = key
+        live.last_push = time.monotonic()
+        live.pushed += 1
+        message = {"type": "decision", "feed": name, "decision": decision}
+        for queue in live.subscribers:
+            # Slow consumers skip intermediate decisions rather than stall the feed.
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(message)
+
+    def stats(self):
+        return {
+            "feeds": len(self._feeds),
+            "subscribers": sum(len(live.subscribers) for live in self._feeds.values()),
+            "pushed": sum(live.pushed for live in self._feeds.values()),
+            "suppressed": sum(live.suppressed for live in self._feeds.values()),
+            "debounce_seconds": self.debounce
+        }
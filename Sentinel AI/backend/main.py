@@ -1,15 +1,628 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-import pandas as pd
-from .pipeline import run_pipeline
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures.process import BrokenProcessPool
 
-app = FastAPI(title="SentinelAI")
+# Taken before the heavy imports below so cold-start figures include them.
+_STARTED = time.perf_counter()
 
-@app.post("/analyze")
-async def analyze(file: UploadFile = File(...), mission: str | None = Form(None)):
+from contextlib import asynccontextmanager  # noqa: E402
+from datetime import datetime  # noqa: E402
+
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Response, WebSocket, WebSocketDisconnect  # noqa: E402
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse  # noqa: E402
+from starlette.concurrency import run_in_threadpool  # noqa: E402
+from .anomaly import ROW_SCORE_MODES, select_detector  # noqa: E402
+from .audit import AuditLog  # noqa: E402
+from .cache import ResultCache, hash_upload, result_key  # noqa: E402
+from .batch import (analyze_feed, create_pool, decide_fleet, default_workers, expand_upload,  # noqa: E402
+                    failed_feed, score_feed, summarize_batch, unique_feeds)
+from .ingest import IngestError, detect_format, read_table  # noqa: E402
+from .jobs import JobQueue, QueueFull  # noqa: E402
+from .live import LiveHub, decision_key, parse_rows  # noqa: E402
+from .metrics import METRICS, collect_timings, record_fallback, stage  # noqa: E402
+from .pipeline import SAFE_FALLBACK, decide, run_pipeline, run_pipeline_chunked, run_timeline, warm_up  # noqa: E402
+from .profiles import ProfileStore  # noqa: E402
+from .registry import ModelRegistry  # noqa: E402
+from .store import load_store  # noqa: E402
+from .streaming import FeedAnalyzers  # noqa: E402
+
+_BATCH_POOL = None
+
+
+def _batch_pool():
+    global _BATCH_POOL
+    if _BATCH_POOL is None:
+        _BATCH_POOL = create_pool()
+    return _BATCH_POOL
+
+
+def _discard_batch_pool(pool):
+    # A dead worker breaks the whole executor; the next batch gets a fresh one.
+    global _BATCH_POOL
+    if _BATCH_POOL is pool:
+        _BATCH_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _on_pool(pool, fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(pool, fn, *args)
+
+
+async def _map_feeds(calls, fleet):
+    """Runs ``(name, fn, *args)`` calls on the batch pool.
+
+    Feeds lost to a dead worker are reported as per-feed errors and the pool is
+    replaced, instead of failing this and every later batch.
+    """
+    pool = _batch_pool()
+    results = await asyncio.gather(*(_on_pool(pool, fn, name, *args) for name, fn, *args in calls),
+                                   return_exceptions=True)
+    outcomes = []
+    broken = False
+    for (name, *_), result in zip(calls, results):
+        if isinstance(result, BrokenProcessPool):
+            broken = True
+            outcomes.append(failed_feed(name, f"Worker process died: {result}", fleet))
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            outcomes.append(result)
+    if broken:
+        _discard_batch_pool(pool)
+    return outcomes
+
+
+# Detectors exercised before the worker reports ready; empty disables warm-up.
+WARMUP_DETECTORS = [
+    name.strip() for name in os.environ.get("SENTINEL_WARMUP_DETECTORS", "forest").split(",") if name.strip()
+]
+STARTUP = {"ready": False, "import_ms": None, "warmup_ms": None, "ready_ms": None, "first_decision_ms": None}
+
+
+def _since_start():
+    return round((time.perf_counter() - _STARTED) * 1000, 3)
+
+
+async def _warm_up():
     try:
-        df = pd.read_csv(file.file)
+        STARTUP["warmup_ms"] = await run_in_threadpool(warm_up, WARMUP_DETECTORS)
+        STARTUP["profiles"] = await run_in_threadpool(PROFILES.load_all)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Failed to read CSV: {e}")
+        STARTUP["warmup_error"] = f"{type(e).__name__}: {e}"
+    STARTUP["ready"] = True
+    STARTUP["ready_ms"] = _since_start()
+
+
+def _first_decision():
+    if STARTUP["first_decision_ms"] is None:
+        STARTUP["first_decision_ms"] = _since_start()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    STARTUP["import_ms"] = _since_start()
+    # Warm-up runs in the background so liveness probes answer while /ready reports 503.
+    warming = asyncio.create_task(_warm_up())
+    yield
+    await warming
+    JOB_QUEUE.shutdown()
+    if _BATCH_POOL is not None:
+        _discard_batch_pool(_BATCH_POOL)
+
+
+app = FastAPI(title="SentinelAI", lifespan=lifespan)
+
+# Under `uvicorn --workers N` each process has its own memory; a shared store lets
+# workers reuse models and decisions produced by their siblings.
+SHARED_STORE = load_store(
+    os.environ.get("SENTINEL_STORE"),
+    max_bytes=int(float(os.environ.get("SENTINEL_STORE_MAX_MB", "1024")) * 1024 * 1024)
+)
+
+# Fitted detectors are cached per feed so repeat uploads skip training.
+MODEL_REGISTRY = ModelRegistry(
+    capacity=int(os.environ.get("SENTINEL_MODEL_CAPACITY", "64")),
+    persist_dir=os.environ.get("SENTINEL_MODEL_DIR") or None,
+    store=SHARED_STORE
+)
+
+# Identical uploads (retries, dashboard refreshes) reuse the stored decision.
+RESULT_CACHE = ResultCache(
+    capacity=int(os.environ.get("SENTINEL_RESULT_CACHE_SIZE", "256")),
+    ttl_seconds=float(os.environ.get("SENTINEL_RESULT_CACHE_TTL", "300")),
+    store=SHARED_STORE
+)
+
+# Submitted analyses run on a bounded pool; a full queue rejects new work with 429.
+JOB_QUEUE = JobQueue(
+    workers=int(os.environ.get("SENTINEL_JOB_WORKERS", "2")),
+    max_pending=int(os.environ.get("SENTINEL_JOB_QUEUE", "32"))
+)
+SPOOL_BYTES = 8 * 1024 * 1024
+
+# Decisions are appended to an on-disk audit log when a directory is configured.
+AUDIT_LOG = AuditLog(os.environ["SENTINEL_AUDIT_DIR"]) if os.environ.get("SENTINEL_AUDIT_DIR") else None
+
+# Rolling feeds keep running statistics so each post only pays for its new rows.
+FEED_ANALYZERS = FeedAnalyzers(
+    capacity=int(os.environ.get("SENTINEL_FEED_CAPACITY", "256")),
+    baseline_rows=int(os.environ.get("SENTINEL_STREAM_BASELINE", "200")),
+    registry=MODEL_REGISTRY
+)
+
+# Named baseline profiles built offline (python -m backend.profiles build ...), loaded once per process.
+PROFILES = ProfileStore(os.environ.get("SENTINEL_PROFILE_DIR", "profiles"))
+
+# Live subscribers get a decision when a feed's risk level or top features change, at most once per debounce window.
+LIVE_HUB = LiveHub(debounce=float(os.environ.get("SENTINEL_LIVE_DEBOUNCE", "1.0")))
+
+
+def _check_detector(detector):
+    try:
+        select_detector(detector)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _detect_options(feed, baseline_rows, chunked, detector):
+    _check_detector(detector)
+    detect_options = {"detector": detector}
+    if feed:
+        detect_options.update(registry=MODEL_REGISTRY, feed=feed, baseline_rows=baseline_rows)
+    if chunked:
+        detect_options.setdefault("baseline_rows", baseline_rows)
+    return detect_options
+
+
+def _profile_options(name, chunked):
+    if not name:
+        return {}
+    if chunked:
+        raise HTTPException(status_code=400, detail="Baseline profiles are not available on the chunked path")
+    try:
+        return {"profile": PROFILES.get(name)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown profile '{name}'")
+
+
+def _upload_format(file, override):
+    try:
+        return detect_format(file.filename, file.content_type, override)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _row_options(chunked, top_rows, row_scores, row_offset, row_limit):
+    if not top_rows and not row_scores:
+        return {}
+    if chunked:
+        raise HTTPException(status_code=400, detail="Per-row scores are not available on the chunked path")
+    if row_scores and row_scores not in ROW_SCORE_MODES:
+        raise HTTPException(status_code=400, detail=f"row_scores must be one of: {', '.join(ROW_SCORE_MODES)}")
+    if top_rows < 0 or row_offset < 0 or row_limit < 0:
+        raise HTTPException(status_code=400, detail="top_rows, row_offset and row_limit must be non-negative")
+    return {"top_rows": top_rows, "row_scores": row_scores, "row_offset": row_offset, "row_limit": row_limit}
+
+
+def _audit(result, feed=None):
+    if AUDIT_LOG is not None and result.get("risk_level"):
+        AUDIT_LOG.append(result, feed=feed)
+
+
+def _audit_batch(outcomes):
+    for name, result, _, _ in outcomes:
+        _audit(result, name)
+
+
+def _parse_time(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid timestamp '{value}'; use epoch seconds or ISO 8601")
+
+
+def _run_analysis(source, mission, chunked, detect_options, fmt="csv"):
+    with collect_timings() as timings, stage("pipeline"):
+        if chunked:
+            result = run_pipeline_chunked(source, mission=mission, fmt=fmt, **detect_options)
+        else:
+            with stage("parse"):
+                df = read_table(source, fmt)
+            result = run_pipeline(df, mission=mission, **detect_options)
+    return result, timings
+
+
+@app.post("/analyze")
+async def analyze(
+    response: Response,
+    file: UploadFile = File(...),
+    mission: str | None = Form(None),
+    feed: str | None = Form(None),
+    baseline_rows: int | None = Form(None),
+    chunked: bool = Form(False),
+    detector: str | None = Form(None),
+    timings: bool = Form(False),
+    data_format: str | None = Form(None, alias="format"),
+    top_rows: int = Form(0),
+    row_scores: str | None = Form(None),
+    row_offset: int = Form(0),
+    row_limit: int = Form(1000),
+    profile: str | None = Form(None)
+):
+    detect_options = _detect_options(feed, baseline_rows, chunked, detector)
+    detect_options.update(_row_options(chunked, top_rows, row_scores, row_offset, row_limit))
+    detect_options.update(_profile_options(profile, chunked))
+    fmt = _upload_format(file, data_format)
+
+    cache_key = None
+    if RESULT_CACHE.enabled:
+        start = time.perf_counter()
+        digest = await run_in_threadpool(hash_upload, file.file)
+        cache_key = result_key(
+            digest, mission, feed=feed, baseline_rows=baseline_rows, chunked=chunked, detector=detector, fmt=fmt,
+            top_rows=top_rows, row_scores=row_scores, row_offset=row_offset, row_limit=row_limit,
+            profile=f"{profile}@{detect_options['profile'].digest}" if profile else None
+        )
+        cached = RESULT_CACHE.get(cache_key)
+        METRICS.inc("sentinel_result_cache_total", outcome="hit" if cached is not None else "miss")
+        if cached is not None:
+            response.headers["X-Sentinel-Cache"] = "hit"
+            # A re-served decision is still a decision issued to this caller.
+            await run_in_threadpool(_audit, cached, feed)
+            if timings:
+                cached["timings"] = {"cache_lookup": round((time.perf_counter() - start) * 1000, 3)}
+            return cached
+
+    # Parsing and scoring are CPU bound; keep them off the event loop.
+    try:
+        result, stage_timings = await run_in_threadpool(_run_analysis, file.file, mission, chunked, detect_options, fmt)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if cache_key is not None and result.get("mission_status") != "DEFERRED":
+        RESULT_CACHE.put(cache_key, result)
+        response.headers["X-Sentinel-Cache"] = "miss"
+    await run_in_threadpool(_audit, result, feed)
+    _first_decision()
+    if timings:
+        result["timings"] = stage_timings
+    return result
+
+
+def _run_timeline(source, fmt, window, stride, mission, detect_options):
+    with stage("parse"):
+        df = read_table(source, fmt)
+    return run_timeline(df, window=window, stride=stride, mission=mission, **detect_options)
+
+
+@app.post("/analyze/timeline")
+async def analyze_timeline(
+    file: UploadFile = File(...),
+    mission: str | None = Form(None),
+    window: int = Form(200),
+    stride: int | None = Form(None),
+    feed: str | None = Form(None),
+    baseline_rows: int | None = Form(None),
+    detector: str | None = Form(None),
+    data_format: str | None = Form(None, alias="format")
+):
+    if window < 2 or (stride is not None and stride < 1):
+        raise HTTPException(status_code=400, detail="window must be >= 2 and stride >= 1")
+    detect_options = _detect_options(feed, baseline_rows, False, detector)
+    fmt = _upload_format(file, data_format)
+    try:
+        return await run_in_threadpool(_run_timeline, file.file, fmt, window, stride, mission, detect_options)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(
+    files: list[UploadFile] = File(...),
+    mission: str | None = Form(None),
+    detector: str | None = Form(None),
+    fleet: bool = Form(False)
+):
+    _check_detector(detector)
+    pairs = []
+    try:
+        for upload in files:
+            pairs.extend(expand_upload(upload.filename, await upload.read(), upload.content_type))
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    feeds = unique_feeds(pairs)
+    if not feeds:
+        raise HTTPException(status_code=400, detail="No feeds found in upload")
+
+    start = time.perf_counter()
+    fleet_ms = None
+    if fleet:
+        # Workers only fit and score; the statistics for every feed come from one stacked pass here.
+        scored = await _map_feeds(
+            [(name, score_feed, data, detector, fmt) for name, (data, fmt) in feeds.items()], fleet=True
+        )
+        fleet_start = time.perf_counter()
+        outcomes = await run_in_threadpool(decide_fleet, scored, mission)
+        fleet_ms = round((time.perf_counter() - fleet_start) * 1000, 2)
+    else:
+        outcomes = await _map_feeds(
+            [(name, analyze_feed, data, mission, detector, fmt) for name, (data, fmt) in feeds.items()], fleet=False
+        )
+    wall_ms = (time.perf_counter() - start) * 1000
+    await run_in_threadpool(_audit_batch, outcomes)
+    # Worker processes keep their own counters, so fold their stage timings in here.
+    # Fleet decisions are made in this process and have already been counted.
+    for _, result, _, feed_timings in outcomes:
+        METRICS.record_timings(feed_timings)
+        if result.get("mission_status") == "DEFERRED":
+            record_fallback("batch")
+        elif "risk_level" in result and not fleet:
+            METRICS.inc("sentinel_decisions_total", risk_level=result["risk_level"])
+    summary = summarize_batch(outcomes, wall_ms, default_workers())
+    if fleet_ms is not None:
+        summary["timing"]["fleet_ms"] = fleet_ms
+    return summary
+
+
+@app.get("/ready")
+async def ready():
+    # Readiness probe: 503 until the startup warm-up has finished.
+    return JSONResponse(STARTUP, status_code=200 if STARTUP["ready"] else 503)
+
+
+@app.get("/models")
+async def models():
+    return MODEL_REGISTRY.stats()
+
+
+@app.get("/profiles")
+async def profiles():
+    def describe():
+        return [PROFILES.get(name).describe() for name in PROFILES.names()]
+    return {"profiles": await run_in_threadpool(describe)}
+
+
+@app.get("/cache")
+async def cache_stats():
+    return RESULT_CACHE.stats()
+
+
+@app.post("/feeds/{feed}/rows")
+async def append_rows(
+    feed: str,
+    file: UploadFile = File(...),
+    mission: str | None = Form(None),
+    detector: str | None = Form(None),
+    data_format: str | None = Form(None, alias="format")
+):
+    _check_detector(detector)
+    fmt = _upload_format(file, data_format)
+    try:
+        df = await run_in_threadpool(read_table, file.file, fmt)
+    except IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return await _feed_decision(feed, df, mission, detector)
+
+
+async def _feed_decision(feed, df, mission, detector):
+    analyzer = FEED_ANALYZERS.get(feed, detector=detector)
+    try:
+        summary, anomaly_score = await run_in_threadpool(lambda: analyzer.update(df).summarize())
+    except Exception:
+        record_fallback("stream")
+        result = SAFE_FALLBACK.copy()
+        await run_in_threadpool(_audit, result, feed)
+        return result
+    result = decide(summary, anomaly_score, mission=mission)
+    result["rows_seen"] = analyzer.rows
+    # Covers both POST /feeds/{feed}/rows and WebSocket frames.
+    await run_in_threadpool(_audit, result, feed)
+    if result.get("mission_status") != "DEFERRED":
+        LIVE_HUB.publish(feed, result, decision_key(result["risk_level"], summary))
+    return result
+
+
+async def _forward_live(websocket, queue):
+    while True:
+        await websocket.send_json(await queue.get())
+
+
+@app.websocket("/feeds/{feed}/live")
+async def live_feed(websocket: WebSocket, feed: str, mission: str | None = None, detector: str | None = None):
+    # Frames sent by the client are appended to the feed; decisions come back only when they change.
+    await websocket.accept()
+    try:
+        select_detector(detector)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+    queue = LIVE_HUB.subscribe(feed)
+    live = LIVE_HUB.feed(feed)
+    sender = asyncio.create_task(_forward_live(websocket, queue))
+    try:
+        while True:
+            message = await websocket.receive_text()
+            try:
+                df = parse_rows(message)
+            except IngestError as e:
+                await websocket.send_json({"type": "error", "feed": feed, "detail": str(e)})
+                continue
+            # One batch at a time per feed keeps decisions in arrival order.
+            async with live.lock:
+                await _feed_decision(feed, df, mission, detector)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        LIVE_HUB.unsubscribe(feed, queue)
+
+
+@app.get("/feeds/{feed}/live")
+async def live_events(feed: str, heartbeat: float = 15.0):
+    # Server-sent events for feeds fed through POST /feeds/{feed}/rows or another client's WebSocket.
+    queue = LIVE_HUB.subscribe(feed)
+
+    async def events():
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), max(heartbeat, 0.1))
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: decision\ndata: {json.dumps(message['decision'])}\n\n"
+        finally:
+            LIVE_HUB.unsubscribe(feed, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@app.get("/live")
+async def live_stats():
+    return LIVE_HUB.stats()
+
+
+@app.delete("/feeds/{feed}")
+async def reset_feed(feed: str):
+    return {"feed": feed, "reset": FEED_ANALYZERS.reset(feed)}
+
+
+@app.get("/audit")
+async def audit(
+    feed: str | None = None,
+    risk_level: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 100
+):
+    if AUDIT_LOG is None:
+        raise HTTPException(status_code=404, detail="Audit log disabled; set SENTINEL_AUDIT_DIR")
+    total, records = await run_in_threadpool(
+        AUDIT_LOG.query, feed=feed, risk_level=risk_level.upper() if risk_level else None,
+        since=_parse_time(since), until=_parse_time(until), limit=max(0, min(limit, 10_000))
+    )
+    return {"matches": total, "records": records, "stats": AUDIT_LOG.stats()}
+
+
+@app.get("/metrics")
+async def metrics():
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+def _run_job(source, mission, chunked, detect_options, fmt):
+    result, stage_timings = _run_analysis(source, mission, chunked, detect_options, fmt)
+    _audit(result, detect_options.get("feed"))
+    result["timings"] = stage_timings
+    return result
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    mission: str | None = Form(None),
+    feed: str | None = Form(None),
+    baseline_rows: int | None = Form(None),
+    chunked: bool = Form(False),
+    detector: str | None = Form(None),
+    data_format: str | None = Form(None, alias="format"),
+    top_rows: int = Form(0),
+    row_scores: str | None = Form(None),
+    row_offset: int = Form(0),
+    row_limit: int = Form(1000),
+    profile: str | None = Form(None)
+):
+    detect_options = _detect_options(feed, baseline_rows, chunked, detector)
+    detect_options.update(_row_options(chunked, top_rows, row_scores, row_offset, row_limit))
+    detect_options.update(_profile_options(profile, chunked))
+    fmt = _upload_format(file, data_format)
+    if JOB_QUEUE.depth() >= JOB_QUEUE.max_pending:
+        raise HTTPException(status_code=429, detail="Job queue is full", headers={"Retry-After": "1"})
+
+    # The upload is closed once this request returns, so the job gets its own spooled copy.
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    await run_in_threadpool(shutil.copyfileobj, file.file, spool)
+    spool.seek(0)
+    try:
+        job = JOB_QUEUE.submit(_run_job, spool, mission, chunked, detect_options, fmt, cleanup=spool.close)
+    except QueueFull as e:
+        spool.close()
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+    except Exception:
+        spool.close()
+        raise
+    return {"job_id": job.id, "status": job.status, "queue_depth": JOB_QUEUE.depth()}
+
+
+@app.get("/jobs")
+async def job_stats():
+    return JOB_QUEUE.stats()
+
+
+def _lookup_job(job_id):
+    job = JOB_QUEUE.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job {job_id}")
+    return job
+
+
+async def _wait_for(job, timeout):
+    if job.finished or timeout <= 0:
+        return
+    try:
+        await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(job.future)), timeout)
+    except asyncio.TimeoutError:
+        pass
+    except asyncio.CancelledError:
+        # The job itself was cancelled by a queue shutdown; anything else is ours to propagate.
+        if not job.future.cancelled():
+            raise
+
+
+@app.get("/jobs/{job_id}")
+async def job_status(job_id: str):
+    return _lookup_job(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+async def job_result(job_id: str, wait: float = 0.0):
+    # Long-poll: hold the request for up to ``wait`` seconds before reporting progress.
+    job = _lookup_job(job_id)
+    await _wait_for(job, min(max(wait, 0.0), 60.0))
+    if job.status == "done":
+        return job.result
+    if job.status == "failed":
+        raise HTTPException(status_code=422, detail=job.error)
+    return JSONResponse(status_code=202, content=job.to_dict(include_result=False))
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, heartbeat: float = 15.0):
+    job = _lookup_job(job_id)
+
+    async def events():
+        last_status = None
+        while True:
+            if job.status != last_status:
+                last_status = job.status
+                yield f"event: status\ndata: {json.dumps(job.to_dict(include_result=False))}\n\n"
+            if job.finished:
+                break
+            await _wait_for(job, max(heartbeat, 0.1))
+            if not job.finished and job.status == last_status:
+                yield ": keep-alive\n\n"
+        if job.status == "done":
+            yield f"event: result\ndata: {json.dumps(job.result)}\n\n"
 
-    result = run_pipeline(df, mission=mission)
-    return result
\ No newline at end of file
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -0,0 +1,194 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows has no getrusage; the RSS gauge is omitted there.
+    resource = None
+
+# Stage latency buckets in seconds, spanning sub-millisecond agents to multi-second fits.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(16, 34, 2))
+
+TRACE_MEMORY = os.environ.get("SENTINEL_TRACE_MEMORY", "").lower() in ("1", "true", "yes")
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    body = ",".join(f'{key}="{value}"' for key, value in labels)
+    return "{" + body + "}"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_label_text(labels + (('le', repr(float(bound))),))} {cumulative}")
+        lines.append(f"{name}_bucket{_label_text(labels + (('le', '+Inf'),))} {self.count}")
+        lines.append(f"{name}_sum{_label_text(labels)} {self.total}")
+        lines.append(f"{name}_count{_label_text(labels)} {self.count}")
+        return lines
+
+
+class Metrics:
+    """Process-wide counters and histograms rendered in Prometheus text format."""
+
+    HELP = {
+        "sentinel_stage_seconds": ("histogram", "Time spent in each pipeline stage."),
+        "sentinel_peak_alloc_bytes": ("histogram", "Peak Python allocations per traced analysis."),
+        "sentinel_fallback_total": ("counter", "Decisions that fell back to SAFE_FALLBACK."),
+        "sentinel_exceptions_total": ("counter", "Exceptions raised inside pipeline stages."),
+        "sentinel_decisions_total": ("counter", "Decisions issued by risk level."),
+        "sentinel_result_cache_total": ("counter", "Result cache lookups by outcome.")
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def record_timings(self, timings):
+        # Merges a timings block produced elsewhere (e.g. a worker process) into the histograms.
+        for name, value in (timings or {}).items():
+            if name == "peak_alloc_bytes":
+                self.observe("sentinel_peak_alloc_bytes", value, buckets=MEMORY_BUCKETS)
+            else:
+                self.observe("sentinel_stage_seconds", value / 1000, stage=name)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name in described or name not in self.HELP:
+                return
+            kind, text = self.HELP[name]
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+            described.add(name)
+
+        for (name, labels), histogram in histograms:
+            describe(name)
+            lines.extend(histogram.render(name, labels))
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{_label_text(labels)} {value}")
+
+        if resource is not None:
+            # ru_maxrss is kilobytes on Linux and bytes on macOS.
+            max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            if sys.platform != "darwin":
+                max_rss *= 1024
+            lines.append("# HELP sentinel_process_max_rss_bytes Peak resident set size of this worker.")
+            lines.append("# TYPE sentinel_process_max_rss_bytes gauge")
+            lines.append(f"sentinel_process_max_rss_bytes {max_rss}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+_local = threading.local()
+
+
+@contextmanager
+def collect_timings(track_memory: bool = TRACE_MEMORY):
+    """Collects per-stage milliseconds for the analysis running on this thread.
+
+    With ``track_memory`` the block also records peak Python allocations via
+    tracemalloc; the peak is process-wide, so concurrent analyses inflate it.
+    """
+    timings = {}
+    previous = getattr(_local, "timings", None)
+    _local.timings = timings
+    if track_memory:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+        if track_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            timings["peak_alloc_bytes"] = peak
+            METRICS.observe("sentinel_peak_alloc_bytes", peak, buckets=MEMORY_BUCKETS)
+
+
+@contextmanager
+def muted_stages():
+    """Stages run inside this block on this thread are not recorded in ``METRICS``."""
+    previous = getattr(_local, "muted", False)
+    _local.muted = True
+    try:
+        yield
+    finally:
+        _local.muted = previous
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        if not getattr(_local, "muted", False):
+            METRICS.inc("sentinel_exceptions_total", stage=name, type=type(e).__name__)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        if not getattr(_local, "muted", False):
+            METRICS.observe("sentinel_stage_seconds", elapsed, stage=name)
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            timings[name] = round(timings.get(name, 0.0) + elapsed * 1000, 3)
+
+
+def record_fallback(reason):
+    METRICS.inc("sentinel_fallback_total", reason=reason)
@@ -1,5 +1,15 @@
+import time
+
+import numpy as np
+import pandas as pd
+
 from .anomaly import detect_anomalies
-from .agents import analyst_agent, risk_agent, action_agent
+from .agents import analyst_agent, assess_batch, risk_agent, action_agent
+from .ingest import CHUNK_ROWS, IngestError, iter_numeric_chunks
+from .metrics import METRICS, muted_stages, record_fallback, stage
+from .profiles import detect_with_profile
+from .streaming import StreamingAnalyzer
+from .windows import detect_windows
 
 SAFE_FALLBACK = {
     "risk_level": "MEDIUM",
@@ -43,81 +53,217 @@ def _apply_confidence(base, modifier):
     return adjusted
 
 
-def run_pipeline(df, mission: str | None = None):
-    summary = {}
-    mission_brief = mission.strip() if mission else "Protect the current operation."
+def warm_up(detectors=("forest",), registry=None, rows: int = 256, metrics: int = 4):
+    """Runs each detector and the agents once on synthetic data.
+
+    Loads the lazily imported model libraries and touches every code path of a
+    decision, so the first real request does not pay for it. Only the
+    ``warmup`` stage is recorded in the metrics; the synthetic fits stay out of
+    the per-stage histograms and decision counters. Returns milliseconds per
+    detector.
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, metrics)), columns=[f"metric_{idx}" for idx in range(metrics)])
+    warmed = {}
+    for name in detectors:
+        start = time.perf_counter()
+        with stage("warmup"), muted_stages():
+            summary, anomaly_score = detect_anomalies(df, registry=registry, detector=name)
+            assess_batch([summary], [anomaly_score])
+        warmed[name] = round((time.perf_counter() - start) * 1000, 3)
+    return warmed
+
+
+PROFILE_OPTIONS = ("top_rows", "row_scores", "row_offset", "row_limit", "include_stats")
+
+
+def run_pipeline(df, mission: str | None = None, **detect_options):
+    # Decisions never read the per-column stats, so skip building them.
+    detect_options.setdefault("include_stats", False)
+    profile = detect_options.pop("profile", None)
+    try:
+        if profile is not None:
+            # The profile carries its own fitted detector, so per-upload fit options do not apply.
+            options = {name: detect_options[name] for name in PROFILE_OPTIONS if name in detect_options}
+            summary, anomaly_score = detect_with_profile(df, profile, **options)
+        else:
+            summary, anomaly_score = detect_anomalies(df, **detect_options)
+    except Exception:
+        record_fallback("detect")
+        return SAFE_FALLBACK.copy()
+    return decide(summary, anomaly_score, mission=mission)
+
+
+def run_pipeline_chunked(source, mission: str | None = None, chunk_rows: int = CHUNK_ROWS,
+                         registry=None, feed: str | None = None, baseline_rows: int | None = None,
+                         detector: str | None = None, fmt: str = "csv"):
+    # Parses the CSV in bounded batches and folds each one into running statistics.
+    analyzer = StreamingAnalyzer(baseline_rows or chunk_rows, registry=registry, feed=feed, detector=detector)
     try:
-        summary, anomaly_score = detect_anomalies(df)
+        with stage("ingest"):
+            for chunk in iter_numeric_chunks(source, chunk_rows, fmt):
+                analyzer.update(chunk)
+        summary, anomaly_score = analyzer.finish().summarize()
+    except IngestError:
+        raise
     except Exception:
+        record_fallback("detect")
         return SAFE_FALLBACK.copy()
+    return decide(summary, anomaly_score, mission=mission)
+
+
+def run_timeline(df, window: int = 200, stride: int | None = None, mission: str | None = None, **detect_options):
+    mission_brief = _mission_brief(mission)
+    try:
+        timeline, cost = detect_windows(df, window=window, stride=stride, **detect_options)
+    except Exception:
+        record_fallback("timeline")
+        return {"mission_brief": mission_brief, "windows": 0, "timeline": [], "mission_status": "DEFERRED"}
+
+    level_counts = {}
+    for entry in timeline:
+        level_counts[entry["risk_level"]] = level_counts.get(entry["risk_level"], 0) + 1
+    peak = max(timeline, key=lambda entry: entry["risk_score"], default=None)
+    result = {
+        "mission_brief": mission_brief,
+        "windows": len(timeline),
+        "window": int(timeline[0]["end"] - timeline[0]["start"]) if timeline else 0,
+        "risk_counts": level_counts,
+        "peak": peak,
+        "timeline": timeline,
+        "mission_status": "COMPLETED"
+    }
+    if cost:
+        result["detector"] = cost
+    return result
+
 
+def decide(summary, anomaly_score, mission: str | None = None):
+    mission_brief = _mission_brief(mission)
     try:
-        analyst_report = analyst_agent(summary)
+        with stage("analyst"):
+            analyst_report = analyst_agent(summary)
         if not analyst_report or not analyst_report.get("summary"):
             raise ValueError("Analyst agent returned empty output")
 
-        risk_level, risk_note, confidence_modifier = risk_agent(analyst_report, anomaly_score)
-        action, base_confidence, action_reason, command_options = action_agent(risk_level, summary)
-        if not action:
-            raise ValueError("Action agent returned empty action")
-
-        analysis_trace = [
-            f"Analyst: {analyst_report['summary']}",
-            f"Risk check: {risk_note}",
-            f"Action rationale: {action_reason}"
-        ]
-        analysis_text = ". ".join(analysis_trace[:3])
-
-        system_summary = f"SentinelAI assessed {risk_level} risk for the mission and advises: {action}."
-
-        decision_flow = [
-            f"Mission: {mission_brief}",
-            f"Intelligence: {analyst_report['summary']}",
-            f"Decision: {risk_level} with {risk_note}",
-            f"Action: {action}"
-        ]
-
-        execution_log = [
-            f"Mission received: {mission_brief}",
-            f"Intel compiled: {analyst_report['summary']}",
-            f"Decision framed: {risk_level}",
-            f"Action proposed: {action}"
-        ]
-
-        command_options_detail = [
-            {
-                "label": "Execute recommended",
-                "action": action,
-                "note": action_reason,
-                "recommended": True
-            }
-        ]
-        for opt in command_options:
-            if opt == action:
-                continue
-            command_options_detail.append({
-                "label": opt,
-                "action": opt,
-                "note": "Alternative command option",
-                "recommended": False
-            })
-
-        return {
-            "risk_level": risk_level,
-            "signals": (summary.get("signals", []) or [])[:4],
-            "analysis": analysis_text,
-            "recommended_action": action,
-            "confidence": _apply_confidence(base_confidence, confidence_modifier),
-            "system_summary": system_summary,
-            "reasoning_trace": analysis_trace,
-            "mission_brief": mission_brief,
-            "decision_flow": decision_flow,
-            "command_options": command_options,
-            "command_options_detail": command_options_detail,
-            "execution_log": execution_log,
-            "mission_status": "COMPLETED"
-        }
+        with stage("risk"):
+            risk_level, risk_note, confidence_modifier = risk_agent(analyst_report, anomaly_score)
+        with stage("action"):
+            action, base_confidence, action_reason, command_options = action_agent(risk_level, summary)
+        return _compose(summary, mission_brief, analyst_report,
+                        (risk_level, risk_note, confidence_modifier, action, base_confidence, action_reason,
+                         command_options))
+    except Exception:
+        return _decide_fallback(summary)
+
+
+def decide_batch(summaries, scores, mission: str | None = None):
+    """Decisions for many summaries, with one ``assess_batch`` pass for risk and action.
+
+    Each decision matches ``decide`` on the same summary and score. If the
+    batched pass fails, every summary falls back to ``decide`` on its own.
+    """
+    mission_brief = _mission_brief(mission)
+    reports = []
+    with stage("analyst"):
+        for summary in summaries:
+            try:
+                reports.append(analyst_agent(summary))
+            except Exception:
+                reports.append(None)
+    ready = [idx for idx, report in enumerate(reports) if report and report.get("summary")]
+    try:
+        with stage("assess"):
+            assessed = dict(zip(ready, assess_batch([summaries[idx] for idx in ready], [scores[idx] for idx in ready])))
     except Exception:
-        fallback = SAFE_FALLBACK.copy()
-        fallback["signals"] = summary.get("signals", SAFE_FALLBACK["signals"])
-        return fallback
\ No newline at end of file
+        return [decide(summary, score, mission=mission) for summary, score in zip(summaries, scores)]
+
+    decisions = []
+    for idx, summary in enumerate(summaries):
+        try:
+            if idx not in assessed:
+                raise ValueError("Analyst agent returned empty output")
+            decisions.append(_compose(summary, mission_brief, reports[idx], assessed[idx]))
+        except Exception:
+            decisions.append(_decide_fallback(summary))
+    return decisions
+
+
+def _mission_brief(mission):
+    return mission.strip() if mission else "Protect the current operation."
+
+
+def _decide_fallback(summary):
+    record_fallback("decide")
+    fallback = SAFE_FALLBACK.copy()
+    fallback["signals"] = summary.get("signals", SAFE_FALLBACK["signals"])
+    return fallback
+
+
+def _compose(summary, mission_brief, analyst_report, assessment):
+    risk_level, risk_note, confidence_modifier, action, base_confidence, action_reason, command_options = assessment
+    if not action:
+        raise ValueError("Action agent returned empty action")
+
+    analysis_trace = [
+        f"Analyst: {analyst_report['summary']}",
+        f"Risk check: {risk_note}",
+        f"Action rationale: {action_reason}"
+    ]
+    analysis_text = ". ".join(analysis_trace[:3])
+
+    system_summary = f"SentinelAI assessed {risk_level} risk for the mission and advises: {action}."
+
+    decision_flow = [
+        f"Mission: {mission_brief}",
+        f"Intelligence: {analyst_report['summary']}",
+        f"Decision: {risk_level} with {risk_note}",
+        f"Action: {action}"
+    ]
+
+    execution_log = [
+        f"Mission received: {mission_brief}",
+        f"Intel compiled: {analyst_report['summary']}",
+        f"Decision framed: {risk_level}",
+        f"Action proposed: {action}"
+    ]
+
+    command_options_detail = [
+        {
+            "label": "Execute recommended",
+            "action": action,
+            "note": action_reason,
+            "recommended": True
+        }
+    ]
+    for opt in command_options:
+        if opt == action:
+            continue
+        command_options_detail.append({
+            "label": opt,
+            "action": opt,
+            "note": "Alternative command option",
+            "recommended": False
+        })
+
+    decision = {
+        "risk_level": risk_level,
+        "signals": (summary.get("signals", []) or [])[:4],
+        "analysis": analysis_text,
+        "recommended_action": action,
+        "confidence": _apply_confidence(base_confidence, confidence_modifier),
+        "system_summary": system_summary,
+        "reasoning_trace": analysis_trace,
+        "mission_brief": mission_brief,
+        "decision_flow": decision_flow,
+        "command_options": command_options,
+        "command_options_detail": command_options_detail,
+        "execution_log": execution_log,
+        "mission_status": "COMPLETED"
+    }
+    if summary.get("detector"):
+        decision["detector"] = summary["detector"]
+    if summary.get("rows"):
+        decision["row_analysis"] = summary["rows"]
+    METRICS.inc("sentinel_decisions_total", risk_level=risk_level)
+    return decision
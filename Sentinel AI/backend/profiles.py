@@ -0,0 +1,260 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import pickle
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .anomaly import (PREPARE_DTYPE, fit_detector, normalize_scores, prepare_matrix, rank_features, row_report,
+                      select_detector, trend_label, trend_window)
+from .metrics import stage
+
+PROFILE_SUFFIX = ".profile.npz"
+_NAME = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$")
+
+
+class BaselineProfile:
+    """Reference statistics and a fitted detector that uploads are scored against.
+
+    Means, stds and medians are per column in ``columns`` order; ``score_range``
+    holds the min, max and mean decision score of the baseline rows.
+    """
+
+    def __init__(self, name, columns, mean, std, median, score_range, detector, meta=None, digest=None):
+        self.name = name
+        self.columns = list(columns)
+        self.mean = np.asarray(mean, dtype=float)
+        self.std = np.asarray(std, dtype=float)
+        self.median = np.asarray(median, dtype=float)
+        self.score_range = tuple(float(value) for value in score_range)
+        self.detector = detector
+        self.meta = meta or {}
+        self.digest = digest
+
+    def describe(self):
+        return {"name": self.name, "columns": len(self.columns), "digest": self.digest, **self.meta}
+
+    def to_bytes(self):
+        # Arrays stay plain numpy so loading them needs no pickle; only the fitted detector is pickled.
+        buf = io.BytesIO()
+        np.savez_compressed(
+            buf,
+            columns=np.array([str(column) for column in self.columns]),
+            mean=self.mean,
+            std=self.std,
+            median=self.median,
+            score_range=np.array(self.score_range),
+            detector=np.frombuffer(pickle.dumps(self.detector, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8),
+            meta=np.array(json.dumps(self.meta))
+        )
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, name, payload):
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            return cls(
+                name,
+                data["columns"].tolist(),
+                data["mean"],
+                data["std"],
+                data["median"],
+                data["score_range"],
+                pickle.loads(data["detector"].tobytes()),
+                meta=json.loads(str(data["meta"])),
+                digest=hashlib.sha256(payload).hexdigest()[:16]
+            )
+
+
+def build_profile(name, df, detector: str | None = None, source: str | None = None):
+    """Fits a named profile on a reference upload such as a week of normal history."""
+    filled, stats, raw_column = prepare_matrix(df)
+    if filled.empty or len(filled) < 2:
+        raise ValueError("A baseline profile needs at least two rows of numeric data")
+    mode = select_detector(detector, len(filled))
+    model = fit_detector(mode, filled)
+    scores = model.decision_function(filled)
+    median = np.array([np.nanmedian(raw_column(column).to_numpy(dtype=float)) for column in filled.columns])
+    meta = {
+        "detector": mode,
+        "rows": len(filled),
+        "source": source,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    return BaselineProfile(
+        name, [str(column) for column in filled.columns], stats["mean"].to_numpy(), stats["std"].to_numpy(),
+        median, (scores.min(), scores.max(), scores.mean()), model, meta=meta
+    )
+
+
+class ProfileStore:
+    """Directory of named profiles, each read and unpickled at most once per process."""
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self._profiles = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        if not _NAME.match(name or ""):
+            raise ValueError(f"Invalid profile name '{name}'")
+        return os.path.join(self.root, name + PROFILE_SUFFIX)
+
+    def names(self):
+        try:
+            files = os.listdir(self.root)
+        except OSError:
+            return []
+        return sorted(entry[: -len(PROFILE_SUFFIX)] for entry in files if entry.endswith(PROFILE_SUFFIX))
+
+    def get(self, name):
+        path = self._path(name)
+        with self._lock:
+            profile = self._profiles.get(name)
+            if profile is None:
+                try:
+                    with open(path, "rb") as fh:
+                        payload = fh.read()
+                except FileNotFoundError:
+                    raise KeyError(name) from None
+                profile = self._profiles[name] = BaselineProfile.from_bytes(name, payload)
+            return profile
+
+    def save(self, profile):
+        path = self._path(profile.name)
+        os.makedirs(self.root, exist_ok=True)
+        payload = profile.to_bytes()
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(payload)
+        os.replace(tmp, path)
+        profile.digest = hashlib.sha256(payload).hexdigest()[:16]
+        with self._lock:
+            self._profiles[profile.name] = profile
+        return path
+
+    def load_all(self):
+        return [self.get(name).name for name in self.names()]
+
+
+def _aligned_matrix(df, profile):
+    # Upload columns in profile order; gaps and missing columns take the profile's medians.
+    numeric = df.select_dtypes(include="number")
+    by_name = {str(column): position for position, column in enumerate(numeric.columns)}
+    matrix = np.empty((len(numeric), len(profile.columns)), dtype=PREPARE_DTYPE)
+    latest = np.full(len(profile.columns), np.nan)
+    missing = []
+    for idx, column in enumerate(profile.columns):
+        position = by_name.get(column)
+        if position is None:
+            matrix[:, idx] = profile.median[idx]
+            missing.append(column)
+            continue
+        values = numeric.iloc[:, position].to_numpy(dtype=np.float64, na_value=np.nan)
+        matrix[:, idx] = values
+        holes = np.isnan(values)
+        if holes.any():
+            matrix[holes, idx] = profile.median[idx]
+        if len(values):
+            latest[idx] = values[-1]
+    ignored = [name for name in by_name if name not in set(profile.columns)]
+    return numeric, by_name, matrix, latest, missing, ignored
+
+
+def detect_with_profile(df, profile, top_rows=0, row_scores=None, row_offset=0, row_limit=1000,
+                        include_stats=True):
+    """``detect_anomalies`` against a prebuilt profile: score only, no fitting.
+
+    Deviations use the profile's means and stds, and the risk score places the
+    upload's mean decision score within the baseline's score range, so a fully
+    anomalous upload can no longer normalise itself.
+    """
+    with stage("prepare"):
+        numeric, by_name, matrix, latest, missing, ignored = _aligned_matrix(df, profile)
+        if len(missing) == len(profile.columns) or not len(matrix):
+            raise ValueError(f"Upload shares no numeric columns with profile '{profile.name}'")
+        filled = pd.DataFrame(matrix, columns=profile.columns, copy=False)
+
+    cost = {"name": profile.meta.get("detector"), "fit_ms": 0.0, "score_ms": 0.0, "cached": True,
+            "profile": profile.name, "input_bytes": int(matrix.nbytes)}
+    if missing:
+        cost["missing_columns"] = missing
+    if ignored:
+        cost["ignored_columns"] = len(ignored)
+    with stage("score"):
+        start = time.perf_counter()
+        scores = profile.detector.decision_function(matrix)
+        cost["score_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    reference_min, reference_max, _ = profile.score_range
+    normalized_score = normalize_scores(min(reference_min, scores.min()), reference_max, scores.mean())
+
+    with stage("stats"):
+        # Columns the upload lacks carry only the profile's medians, so they are not ranked.
+        kept = [idx for idx, column in enumerate(profile.columns) if column in by_name]
+        columns = [profile.columns[idx] for idx in kept]
+        means = pd.Series(profile.mean[kept], index=columns)
+        raw_stds = pd.Series(profile.std[kept], index=columns)
+        latest = pd.Series(latest[kept], index=columns)
+        reported = filled.iloc[:, kept] if missing else filled
+
+    def build_trend_hint(feature):
+        series = numeric.iloc[:, by_name[feature]]
+        window = trend_window(len(series))
+        if len(series) < window * 2:
+            return "trend unclear"
+        return trend_label(series.head(window).mean(), series.tail(window).mean(), raw_stds[feature])
+
+    with stage("rank"):
+        top_features, signals = rank_features(means, raw_stds, latest, build_trend_hint)
+
+    rows = None
+    if top_rows or row_scores:
+        with stage("rows"):
+            rows = row_report(reported, scores, means, raw_stds, top_rows, row_scores, row_offset, row_limit)
+
+    summary = {"mean": means.to_dict(), "std": raw_stds.to_dict()} if include_stats else {}
+    summary.update({
+        "signals": signals,
+        "top_features": top_features,
+        "risk_score": normalized_score,
+        "detector": cost
+    })
+    if rows is not None:
+        summary["rows"] = rows
+    return summary, normalized_score
+
+
+def main(argv=None):
+    # Offline build: python -m backend.profiles build normal-ops data/normal.csv
+    from .ingest import detect_format, read_table
+
+    parser = argparse.ArgumentParser(description="Build and list SentinelAI baseline profiles.")
+    parser.add_argument("--dir", default=os.environ.get("SENTINEL_PROFILE_DIR", "profiles"))
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="fit a profile from a reference upload")
+    build.add_argument("name")
+    build.add_argument("source")
+    build.add_argument("--detector", default=None)
+    build.add_argument("--format", default=None)
+    commands.add_parser("list", help="list stored profiles")
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.dir)
+    if args.command == "build":
+        df = read_table(args.source, detect_format(args.source, None, args.format))
+        profile = build_profile(args.name, df, detector=args.detector, source=os.path.basename(args.source))
+        path = store.save(profile)
+        print(f"{args.name}: {len(profile.columns)} columns, {profile.meta['rows']} rows -> {path}")
+    else:
+        for name in store.names():
+            print(json.dumps(store.get(name).describe()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,103 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+from .store import FileStore
+
+
+def schema_key(columns, baseline_rows=None, feed=None, detector="forest"):
+    # Models are reusable across uploads that share a feed, detector, column layout and baseline window.
+    digest = hashlib.sha1("\x1f".join(str(c) for c in columns).encode("utf-8")).hexdigest()[:16]
+    window = "all" if baseline_rows is None else str(int(baseline_rows))
+    return f"{feed or '*'}|{detector}|{window}|{digest}"
+
+
+class ModelRegistry:
+    """LRU cache of fitted detectors, backed by an optional shared store.
+
+    The in-process LRU is the first level; ``store`` (see ``store.py``) lets
+    every worker process reuse models fitted by any other.
+    """
+
+    def __init__(self, capacity: int = 64, persist_dir: str | None = None, store=None):
+        self.capacity = max(1, int(capacity))
+        if store is None and persist_dir:
+            store = FileStore(persist_dir)
+        self.store = store
+        self._models = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.shared_hits = 0
+
+    def _load(self, key):
+        if self.store is None:
+            return None
+        payload = self.store.get(f"model:{key}")
+        if payload is None:
+            return None
+        try:
+            return pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return None
+
+    def _dump(self, key, model):
+        if self.store is None:
+            return
+        self.store.set(f"model:{key}", pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _remember(self, key, model):
+        self._models[key] = model
+        self._models.move_to_end(key)
+        while len(self._models) > self.capacity:
+            self._models.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key):
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                return model
+        model = self._load(key)
+        if model is not None:
+            with self._lock:
+                self.shared_hits += 1
+                self._remember(key, model)
+        return model
+
+    def put(self, key, model):
+        with self._lock:
+            self._remember(key, model)
+        self._dump(key, model)
+
+    def get_or_fit(self, key, fit):
+        model = self.get(key)
+        if model is not None:
+            with self._lock:
+                self.hits += 1
+            return model
+        model = fit()
+        with self._lock:
+            self.misses += 1
+        self.put(key, model)
+        return model
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._models),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "shared_hits": self.shared_hits,
+                "persistent": self.store is not None,
+                "store": type(self.store).__name__ if self.store is not None else None
+            }
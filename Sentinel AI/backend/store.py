@@ -0,0 +1,180 @@
+import hashlib
+import importlib
+import ntpath
+import os
+import struct
+import threading
+import time
+
+# Expiry timestamp header for FileStore entries; 0 means no expiry.
+_HEADER = struct.Struct("<d")
+# Temp files older than this belong to a writer that died mid-write.
+_STALE_TMP_SECONDS = 3600
+
+
+class KeyValueStore:
+    """Minimal byte store shared by the model registry and result cache.
+
+    Adapters (Redis, memcached, ...) only need ``get``/``set``/``delete``; values
+    are opaque bytes and ``ttl`` is in seconds.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+
+class MemoryStore(KeyValueStore):
+    # In-process fake with the same semantics as the shared stores.
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires and expires <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.time() + ttl if ttl else 0.0, bytes(value))
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class FileStore(KeyValueStore):
+    """Directory-backed store visible to every worker process on the host.
+
+    Writes go to a temp file and are renamed into place, so readers in other
+    processes never observe partial entries. Every ``prune_every`` writes the
+    store drops expired entries and, when ``max_bytes`` is set, evicts the least
+    recently used files until it fits.
+    """
+
+    def __init__(self, root, max_bytes: int | None = None, prune_every: int = 256):
+        self.root = os.fspath(root)
+        self.max_bytes = max_bytes or None
+        self.prune_every = max(1, int(prune_every))
+        self._writes = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.root, name[:2], name)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fh:
+                payload = fh.read()
+        except OSError:
+            return None
+        if len(payload) < _HEADER.size:
+            return None
+        (expires,) = _HEADER.unpack_from(payload)
+        if expires and expires <= time.time():
+            self.delete(key)
+            return None
+        try:
+            # Marks the entry as recently used for size-bound eviction.
+            os.utime(path)
+        except OSError:
+            pass
+        return payload[_HEADER.size:]
+
+    def set(self, key, value, ttl=None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(time.time() + ttl if ttl else 0.0))
+            fh.write(value)
+        os.replace(tmp, path)
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.prune_every == 0
+        if due:
+            self.prune()
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def prune(self):
+        # Drops expired entries and enforces max_bytes; safe to run from any worker or a cron job.
+        now = time.time()
+        removed = 0
+        live = []
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                path = os.path.join(folder, name)
+                try:
+                    info = os.stat(path)
+                    if name.endswith(".tmp"):
+                        if info.st_mtime < now - _STALE_TMP_SECONDS:
+                            removed += _unlink(path)
+                        continue
+                    with open(path, "rb") as fh:
+                        header = fh.read(_HEADER.size)
+                    (expires,) = _HEADER.unpack(header)
+                except (OSError, struct.error):
+                    continue
+                if expires and expires <= now:
+                    removed += _unlink(path)
+                else:
+                    live.append((info.st_mtime, info.st_size, path))
+        if self.max_bytes is not None:
+            total = sum(size for _, size, _ in live)
+            for _, size, path in sorted(live):
+                if total <= self.max_bytes:
+                    break
+                removed += _unlink(path)
+                total -= size
+        return removed
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+        return 1
+    except OSError:
+        return 0
+
+
+def _has_drive(spec):
+    # ntpath is importable everywhere, so Windows paths are recognised on any host.
+    return bool(ntpath.splitdrive(spec)[0])
+
+
+def load_store(spec, max_bytes: int | None = None):
+    """Builds a store from ``memory://``, ``file:///path`` or ``package.module:factory``.
+
+    ``max_bytes`` bounds a directory store; custom adapters manage their own size.
+    """
+    if not spec:
+        return None
+    if spec == "memory://":
+        return MemoryStore()
+    if spec.startswith("file://"):
+        return FileStore(spec[len("file://"):], max_bytes=max_bytes)
+    # Drive-letter and absolute paths (C:\sentinel\store) contain a colon too.
+    if ":" in spec and not os.path.isabs(spec) and not _has_drive(spec):
+        module_name, factory = spec.split(":", 1)
+        return getattr(importlib.import_module(module_name), factory)()
+    return FileStore(spec, max_bytes=max_bytes)
@@ -0,0 +1,218 @@
+import threading
+import warnings
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from .anomaly import fit_detector, normalize_scores, select_detector, rank_features, trend_label, trend_window
+from .metrics import stage
+from .registry import schema_key
+
+TREND_BUFFER = 5
+
+
+def _nan_mean(rows):
+    # Column means over a small window, skipping NaN like pandas does.
+    block = np.asarray(rows, dtype=float)
+    mask = ~np.isnan(block)
+    counts = mask.sum(axis=0)
+    sums = np.where(mask, block, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+class StreamingAnalyzer:
+    """Per-feed running statistics that update in O(new rows).
+
+    Means and standard deviations are merged with Welford/Chan updates, and the
+    trend windows are kept as fixed-size head/tail buffers, so the summary matches
+    ``detect_anomalies`` on the full history. The detector is fitted once on the
+    first ``baseline_rows`` rows and later rows are only scored.
+    """
+
+    def __init__(self, baseline_rows: int = 200, registry=None, feed: str | None = None, detector: str | None = None):
+        self.baseline_rows = max(2, int(baseline_rows))
+        self.registry = registry
+        self.feed = feed
+        self.detector = select_detector(detector, self.baseline_rows)
+        self.columns = None
+        self.rows = 0
+        self._count = None
+        self._mean = None
+        self._m2 = None
+        self._head = []
+        self._tail = deque(maxlen=TREND_BUFFER)
+        self._pending = []
+        self._medians = None
+        self._model = None
+        self._stream_state = None
+        self._score_min = np.inf
+        self._score_max = -np.inf
+        self._score_sum = 0.0
+        self._score_count = 0
+        self._lock = threading.Lock()
+
+    def _coerce(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk.select_dtypes(include="number").columns)
+            width = len(self.columns)
+            self._count = np.zeros(width)
+            self._mean = np.zeros(width)
+            self._m2 = np.zeros(width)
+        block = chunk.reindex(columns=self.columns)
+        return block.apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+    def _merge_stats(self, block):
+        mask = ~np.isnan(block)
+        count_b = mask.sum(axis=0).astype(float)
+        safe_count = np.maximum(count_b, 1.0)
+        mean_b = np.where(mask, block, 0.0).sum(axis=0) / safe_count
+        m2_b = (np.where(mask, block - mean_b, 0.0) ** 2).sum(axis=0)
+
+        total = self._count + count_b
+        safe_total = np.maximum(total, 1.0)
+        delta = mean_b - self._mean
+        self._mean = self._mean + delta * count_b / safe_total
+        self._m2 = self._m2 + m2_b + delta ** 2 * self._count * count_b / safe_total
+        self._count = total
+
+    def _fill(self, block):
+        return np.where(np.isnan(block), self._medians, block)
+
+    def _fit(self, baseline, window=None):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            medians = np.nan_to_num(np.nanmedian(baseline, axis=0))
+        filled = np.where(np.isnan(baseline), medians, baseline)
+        if self.registry is None:
+            model = fit_detector(self.detector, filled)
+        else:
+            key = schema_key(self.columns, window or self.baseline_rows, self.feed, self.detector)
+            model = self.registry.get_or_fit(key, lambda: fit_detector(self.detector, filled))
+        return model, medians
+
+    def _score(self, block):
+        scores, self._stream_state = self._model.score_stream(self._fill(block), self._stream_state)
+        self._score_min = min(self._score_min, float(scores.min()))
+        self._score_max = max(self._score_max, float(scores.max()))
+        self._score_sum += float(scores.sum())
+        self._score_count += len(scores)
+
+    def update(self, chunk):
+        if chunk is None or len(chunk) == 0:
+            return self
+        with self._lock, stage("stream_update"):
+            block = self._coerce(chunk)
+            if not self.columns:
+                self.rows += len(block)
+                return self
+            self._merge_stats(block)
+            for row in block[:max(0, TREND_BUFFER - len(self._head))]:
+                self._head.append(row)
+            self._tail.extend(block[-TREND_BUFFER:])
+            self.rows += len(block)
+
+            if self._model is None:
+                self._pending.append(block)
+                buffered = sum(len(part) for part in self._pending)
+                if buffered >= self.baseline_rows:
+                    baseline = np.vstack(self._pending)
+                    self._pending = []
+                    self._model, self._medians = self._fit(baseline)
+                    self._score(baseline)
+            else:
+                self._score(block)
+        return self
+
+    def finish(self):
+        """Fits on the buffered rows when the source ended before the baseline filled.
+
+        For bounded sources (the chunked upload path): an upload shorter than
+        ``baseline_rows`` is then scored like ``detect_anomalies`` on the whole
+        upload instead of getting the neutral score. Open-ended feeds never call it.
+        """
+        with self._lock:
+            if self._model is not None or not self._pending:
+                return self
+            baseline = np.vstack(self._pending)
+            if len(baseline) < 2:
+                return self
+            self._pending = []
+            # Keyed by the rows actually seen, so a later full-length baseline is not served this fit.
+            self._model, self._medians = self._fit(baseline, window=len(baseline))
+            self._score(baseline)
+        return self
+
+    def _risk_score(self):
+        # Neutral until the baseline fills, like detect_anomalies on fewer than 2 rows;
+        # refitting on every partial baseline would make each update O(history).
+        if self._model is None:
+            return 0.5
+        return normalize_scores(self._score_min, self._score_max, self._score_sum / self._score_count)
+
+    def summarize(self):
+        with self._lock, stage("stream_summarize"):
+            present = [idx for idx, count in enumerate(self._count if self._count is not None else []) if count > 0]
+            if not present:
+                return {"mean": {}, "std": {}, "signals": ["no numeric fields detected"], "top_features": []}, 0.0
+
+            columns = [self.columns[idx] for idx in present]
+            counts = self._count[present]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                variances = np.where(counts > 1, self._m2[present] / (counts - 1), np.nan)
+            means = pd.Series(self._mean[present], index=columns)
+            raw_stds = pd.Series(np.sqrt(variances), index=columns)
+            latest = pd.Series(self._tail[-1][present], index=columns)
+
+            window = trend_window(self.rows)
+            prior = pd.Series(_nan_mean(self._head[:window])[present], index=columns)
+            recent = pd.Series(_nan_mean(list(self._tail)[-window:])[present], index=columns)
+
+            def build_trend_hint(feature):
+                if self.rows < window * 2:
+                    return "trend unclear"
+                return trend_label(prior[feature], recent[feature], raw_stds[feature])
+
+            top_features, signals = rank_features(means, raw_stds, latest, build_trend_hint)
+            normalized_score = self._risk_score()
+
+        summary = {
+            "mean": means.to_dict(),
+            "std": raw_stds.to_dict(),
+            "signals": signals,
+            "top_features": top_features,
+            "risk_score": normalized_score,
+            "detector": {"name": self.detector, "fit_ms": self._model.fit_ms if self._model is not None else 0.0}
+        }
+        return summary, normalized_score
+
+
+class FeedAnalyzers:
+    """Bounded LRU of streaming analyzers keyed by feed id."""
+
+    def __init__(self, capacity: int = 256, baseline_rows: int = 200, registry=None):
+        self.capacity = max(1, int(capacity))
+        self.baseline_rows = baseline_rows
+        self.registry = registry
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, feed, detector: str | None = None):
+        # The detector is chosen when a feed is first seen and kept until it is reset.
+        with self._lock:
+            analyzer = self._feeds.get(feed)
+            if analyzer is None:
+                analyzer = StreamingAnalyzer(self.baseline_rows, registry=self.registry, feed=feed, detector=detector)
+                self._feeds[feed] = analyzer
+                while len(self._feeds) > self.capacity:
+                    self._feeds.popitem(last=False)
+            self._feeds.move_to_end(feed)
+            return analyzer
+
+    def reset(self, feed):
+        with self._lock:
+            return self._feeds.pop(feed, None) is not None
+
+    def __len__(self):
+        return len(self._feeds)
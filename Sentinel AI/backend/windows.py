@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from .agents import LEVELS, risk_levels
+from .anomaly import describe_feature, normalize_scores, score_rows, trend_label, trend_window
+from .metrics import stage
+
+
+def _prefix_sums(values):
+    # Prefix sums with a leading zero row, so any [start, end) sum is one subtraction.
+    mask = ~np.isnan(values)
+    centred = np.where(mask, values, 0.0)
+    zero = np.zeros((1, values.shape[1]))
+    counts = np.vstack([zero, np.cumsum(mask, axis=0)])
+    sums = np.vstack([zero, np.cumsum(centred, axis=0)])
+    squares = np.vstack([zero, np.cumsum(centred ** 2, axis=0)])
+    return counts, sums, squares
+
+
+def _window_means(counts, sums, starts, ends):
+    count = counts[ends] - counts[starts]
+    total = sums[ends] - sums[starts]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count, np.nan), count
+
+
+def window_bounds(rows, window, stride=None):
+    window = max(2, min(int(window), rows))
+    stride = max(1, int(stride or window))
+    starts = np.arange(0, rows - window + 1, stride)
+    # Always close the timeline on the latest row.
+    if starts[-1] + window < rows:
+        starts = np.append(starts, rows - window)
+    return starts, starts + window
+
+
+def detect_windows(df, window: int = 200, stride: int | None = None, top_k: int = 3,
+                   detector=None, registry=None, feed=None, baseline_rows=None):
+    """Risk timeline over sliding windows of a long history.
+
+    The detector is fitted once and every row is scored once; window means,
+    stds and trend windows come from prefix sums and score min/max from rolling
+    extrema, so cost grows with rows rather than windows x window size.
+    """
+    with stage("prepare"):
+        numeric = df.select_dtypes(include="number").dropna(axis=1, how="all")
+        if numeric.empty or len(numeric) < 2:
+            return [], None
+        filled = numeric.fillna(numeric.median())
+
+    scores, cost = score_rows(filled, detector, registry, feed, baseline_rows)
+
+    with stage("windows"):
+        columns = list(numeric.columns)
+        raw = numeric.to_numpy(dtype=float)
+        # Centre on the global mean so the sum-of-squares variance stays numerically stable.
+        offset = np.nanmean(raw, axis=0)
+        values = raw - offset
+        starts, ends = window_bounds(len(values), window, stride)
+        size = int(ends[0] - starts[0])
+
+        counts, sums, squares = _prefix_sums(values)
+        means, count = _window_means(counts, sums, starts, ends)
+        total_sq = squares[ends] - squares[starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = np.where(count > 1, (total_sq - count * means ** 2) / (count - 1), np.nan)
+        raw_stds = np.sqrt(np.maximum(variance, 0.0))
+        latest = values[ends - 1]
+
+        stds = np.where(raw_stds == 0, 1e-9, raw_stds)
+        z_scores = np.abs(latest - means) / (stds + 1e-9)
+        with np.errstate(invalid="ignore"):
+            above = latest >= means
+        rank_key = np.where(np.isnan(z_scores), -1.0, z_scores)
+        rank_key = np.where(count > 0, rank_key, -2.0)
+        k = min(top_k, len(columns))
+        candidates = np.argpartition(-rank_key, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(rank_key, candidates, axis=1), axis=1, kind="stable")
+        top = np.take_along_axis(candidates, order, axis=1)
+
+        trend_size = trend_window(size)
+        prior, _ = _window_means(counts, sums, starts, starts + trend_size)
+        recent, _ = _window_means(counts, sums, ends - trend_size, ends)
+        trend_clear = size >= trend_size * 2
+
+        score_series = pd.Series(scores)
+        score_min = score_series.rolling(size).min().to_numpy()[ends - 1]
+        score_max = score_series.rolling(size).max().to_numpy()[ends - 1]
+        score_sums = np.concatenate([[0.0], np.cumsum(scores)])
+        score_mean = (score_sums[ends] - score_sums[starts]) / size
+
+    timeline = []
+    risk_scores = []
+    with stage("timeline"):
+        for idx, (start, end) in enumerate(zip(starts, ends)):
+            top_features = []
+            signals = []
+            for metric in top[idx]:
+                if count[idx, metric] == 0:
+                    continue
+                feature = columns[metric]
+                deviation = float(round(z_scores[idx, metric], 2))
+                direction = "above" if above[idx, metric] else "below"
+                if trend_clear:
+                    trend_hint = trend_label(prior[idx, metric], recent[idx, metric], raw_stds[idx, metric])
+                else:
+                    trend_hint = "trend unclear"
+                detail, signal = describe_feature(feature, deviation, direction, trend_hint)
+                top_features.append(detail)
+                signals.append(signal)
+            if not signals:
+                signals = ["statistical deviation detected"]
+
+            risk_score = normalize_scores(score_min[idx], score_max[idx], score_mean[idx])
+            timeline.append({
+                "start": int(start),
+                "end": int(end),
+                "risk_level": None,
+                "risk_score": round(risk_score, 4),
+                "top_features": top_features,
+                "signals": signals,
+                "window_mean": {
+                    columns[metric]: float(means[idx, metric] + offset[metric]) for metric in top[idx]
+                    if count[idx, metric] > 0
+                }
+            })
+            risk_scores.append(risk_score)
+        # Levels for every window come from the decision table in one vectorised pass.
+        for entry, level in zip(timeline, risk_levels(timeline, risk_scores)):
+            entry["risk_level"] = LEVELS[level]
+    return timeline, cost
@@ -0,0 +1,287 @@
+"""Reproducible benchmarks for the SentinelAI hot path.
+
+Sweeps row, metric and feed counts over the demo scenario generators, times
+``detect_anomalies``, ``run_pipeline``, ``POST /analyze`` (in-process test
+client) and the fleet statistics pass (``detect_fleet``), and appends throughput, latency percentiles, each case's
+traced peak allocation and the process peak RSS to a JSON history file.
+``--cold-start N`` also times N fresh interpreters from launch to their first
+decision. With ``--check`` the run fails when any case is slower than the
+previous recorded run by more than ``--tolerance``, or allocates more than
+``--memory-tolerance`` above it.
+
+    python benchmarks/bench_pipeline.py --rows 100 1000 100000 --metrics 4 16 --feeds 1 8
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from backend.anomaly import detect_anomalies  # noqa: E402
+from backend.fleet import detect_fleet, stack_feeds  # noqa: E402
+from backend.pipeline import run_pipeline  # noqa: E402
+from data.demo_scenarios import generate_high_risk_ops, generate_medium_risk_ops, generate_normal_ops  # noqa: E402
+
+GENERATORS = {
+    "normal": generate_normal_ops,
+    "medium": generate_medium_risk_ops,
+    "high": generate_high_risk_ops
+}
+TARGETS = ("detect", "pipeline", "endpoint", "fleet")
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "history.json")
+# Allocation growth below this many MB is noise, whatever the ratio.
+MEMORY_SLACK_MB = 1.0
+
+# Runs in a fresh interpreter: start the app, wait for readiness, serve one decision.
+COLD_START_SCRIPT = """
+import json, time
+from fastapi.testclient import TestClient
+from backend.main import STARTUP, app
+with TestClient(app) as client:
+    while client.get("/ready").status_code != 200:
+        time.sleep(0.005)
+    client.post("/analyze", files={"file": ("cold.csv", b"a,b\\n1,2\\n3,4\\n5,9\\n")}).raise_for_status()
+print(json.dumps(STARTUP))
+"""
+
+
+def peak_rss_mb():
+    # Process-lifetime high-water mark, so it only grows across cases; see traced_peak_mb.
+    if resource is None:
+        return None
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_feed(scenario, rows, metrics, seed):
+    # The generators emit four metrics; wider feeds stack independently seeded copies.
+    np.random.seed(seed)
+    generate = GENERATORS[scenario]
+    blocks = []
+    copy = 0
+    while sum(block.shape[1] for block in blocks) < metrics:
+        block = generate(rows)
+        if copy:
+            block = block.add_suffix(f"_{copy}")
+        blocks.append(block)
+        copy += 1
+    return pd.concat(blocks, axis=1).iloc[:, :metrics]
+
+
+def percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": round(float(np.percentile(values, 50)), 3),
+        "p95_ms": round(float(np.percentile(values, 95)), 3),
+        "p99_ms": round(float(np.percentile(values, 99)), 3),
+        "mean_ms": round(float(values.mean()), 3)
+    }
+
+
+def run_case(target, feeds, repeat, client=None):
+    if target == "endpoint":
+        payloads = []
+        for frame in feeds:
+            buf = io.StringIO()
+            frame.to_csv(buf, index=False)
+            payloads.append(buf.getvalue().encode("utf-8"))
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if target == "fleet":
+            # Feature statistics for every feed in one stacked pass; detector scoring is not included.
+            stacked, columns, lengths = stack_feeds(feeds)
+            detect_fleet(stacked, columns, lengths)
+            samples.append(time.perf_counter() - start)
+            continue
+        for idx, frame in enumerate(feeds):
+            if target == "detect":
+                detect_anomalies(frame)
+            elif target == "pipeline":
+                run_pipeline(frame, mission="benchmark")
+            else:
+                response = client.post(
+                    "/analyze", files={"file": (f"feed{idx}.csv", payloads[idx], "text/csv")}, data={"mission": "benchmark"}
+                )
+                response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def traced_peak_mb(target, feeds, client=None):
+    # One extra untimed pass under tracemalloc gives a peak that belongs to this case alone.
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    try:
+        run_case(target, feeds, 1, client)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return round(peak / (1024 * 1024), 1)
+
+
+def cold_start(runs):
+    walls = []
+    startups = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_START_SCRIPT], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        walls.append(time.perf_counter() - start)
+        startups.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "runs": runs,
+        "wall_p50_ms": round(float(np.median(walls)) * 1000, 3),
+        "import_p50_ms": round(float(np.median([s["import_ms"] for s in startups])), 3),
+        "ready_p50_ms": round(float(np.median([s["ready_ms"] for s in startups])), 3),
+        "first_decision_p50_ms": round(float(np.median([s["first_decision_ms"] for s in startups])), 3)
+    }
+
+
+def case_key(case):
+    return f"{case['target']}:{case['scenario']}:{case['rows']}x{case['metrics']}x{case['feeds']}"
+
+
+def compare(previous, results, tolerance, memory_tolerance):
+    baseline = {case_key(case): case for case in (previous or {}).get("results", [])}
+    regressions = []
+    for case in results:
+        before = baseline.get(case_key(case))
+        if not before:
+            continue
+        ratio = case["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 1.0
+        case["vs_previous"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append((case_key(case), "p50", before["p50_ms"], case["p50_ms"], "ms"))
+        # Runs recorded before per-case tracing have no allocation peak to compare against.
+        if before.get("peak_alloc_mb") is None:
+            continue
+        grown = case["peak_alloc_mb"] - before["peak_alloc_mb"]
+        if grown > MEMORY_SLACK_MB and case["peak_alloc_mb"] > before["peak_alloc_mb"] * (1 + memory_tolerance):
+            regressions.append((case_key(case), "peak alloc", before["peak_alloc_mb"], case["peak_alloc_mb"], "MB"))
+    return regressions
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100, 1_000, 10_000, 100_000])
+    parser.add_argument("--metrics", type=int, nargs="+", default=[4])
+    parser.add_argument("--feeds", type=int, nargs="+", default=[1])
+    parser.add_argument("--scenarios", nargs="+", choices=sorted(GENERATORS), default=["normal", "high"])
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--history", default=DEFAULT_HISTORY)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed p50 slowdown vs the previous run")
+    parser.add_argument("--memory-tolerance", type=float, default=0.25,
+                        help="allowed peak allocation growth vs the previous run")
+    parser.add_argument("--check", action="store_true", help="exit non-zero when a case regresses")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--cold-start", type=int, default=0, metavar="N", help="time N fresh worker start-ups")
+    args = parser.parse_args(argv)
+
+    client = None
+    if "endpoint" in args.targets:
+        # Every repeat posts the same bytes; the result cache would answer all but the first.
+        os.environ["SENTINEL_RESULT_CACHE_SIZE"] = "0"
+        from fastapi.testclient import TestClient
+        from backend.main import app
+        client = TestClient(app)
+
+    results = []
+    for scenario in args.scenarios:
+        for rows in args.rows:
+            for metrics in args.metrics:
+                for feed_count in args.feeds:
+                    feeds = [build_feed(scenario, rows, metrics, args.seed + idx) for idx in range(feed_count)]
+                    for target in args.targets:
+                        samples = run_case(target, feeds, args.repeat, client)
+                        case = {
+                            "target": target,
+                            "scenario": scenario,
+                            "rows": rows,
+                            "metrics": metrics,
+                            "feeds": feed_count,
+                            **percentiles(samples),
+                            "rows_per_s": round(rows * feed_count / float(np.median(samples)), 1),
+                            "peak_alloc_mb": traced_peak_mb(target, feeds, client),
+                            "peak_rss_mb": peak_rss_mb()
+                        }
+                        results.append(case)
+                        print(
+                            f"{case_key(case):<40} p50 {case['p50_ms']:>10.2f} ms  p99 {case['p99_ms']:>10.2f} ms"
+                            f"  {case['rows_per_s']:>14,.0f} rows/s  alloc {case['peak_alloc_mb']} MB"
+                        )
+
+    cold = None
+    if args.cold_start:
+        cold = cold_start(args.cold_start)
+        print(
+            f"cold start: import {cold['import_p50_ms']:.0f} ms  ready {cold['ready_p50_ms']:.0f} ms"
+            f"  first decision {cold['first_decision_p50_ms']:.0f} ms  process wall {cold['wall_p50_ms']:.0f} ms"
+        )
+
+    history = load_history(args.history)
+    regressions = compare(history[-1] if history else None, results, args.tolerance, args.memory_tolerance)
+    run = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "repeat": args.repeat,
+        "results": results
+    }
+    if cold:
+        run["cold_start"] = cold
+    if not args.no_save:
+        history.append(run)
+        with open(args.history, "w", encoding="utf-8") as fh:
+            json.dump(history, fh, indent=2)
+
+    for key, metric, before, after, unit in regressions:
+        print(f"REGRESSION {key}: {metric} {before:.2f} {unit} -> {after:.2f} {unit}")
+    return 1 if regressions and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
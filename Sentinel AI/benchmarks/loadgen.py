@@ -0,0 +1,247 @@
+"""Load generator and throughput gate for ``POST /analyze``.
+
+Starts ``uvicorn backend.main:app`` locally (or targets ``--url``), replays
+``data/*.csv`` and synthetic uploads from ``data/demo_scenarios.py`` at the
+requested concurrency, and reports requests per second, p50/p95/p99 latency,
+error rate and fallback rate per payload. ``--save-baseline`` stores the run;
+``--check`` fails when throughput or p95 latency is worse than the stored
+baseline by more than ``--tolerance``.
+
+    python benchmarks/loadgen.py --concurrency 8 --duration 30 --rows 1000 100000 --check
+"""
+import argparse
+import asyncio
+import glob
+import io
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from bench_pipeline import GENERATORS, ROOT, build_feed, git_revision, percentiles
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "load_baseline.json")
+
+
+def build_payloads(rows, scenarios, metrics, seed, include_files=True):
+    payloads = []
+    if include_files:
+        for path in sorted(glob.glob(os.path.join(ROOT, "data", "*.csv"))):
+            with open(path, "rb") as fh:
+                payloads.append((os.path.basename(path), fh.read()))
+    for scenario in scenarios:
+        for count in rows:
+            buf = io.StringIO()
+            build_feed(scenario, count, metrics, seed).to_csv(buf, index=False)
+            payloads.append((f"{scenario}:{count}x{metrics}", buf.getvalue().encode("utf-8")))
+    return payloads
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(port, workers, env_overrides):
+    env = dict(os.environ, **env_overrides)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "backend.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, env=env
+    )
+
+
+async def wait_ready(client, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/ready")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError(f"Service not ready after {timeout:.0f}s")
+
+
+async def drive(client, payloads, concurrency, duration, requests, bust_cache):
+    samples = {label: [] for label, _ in payloads}
+    outcomes = {label: {"errors": 0, "fallbacks": 0} for label, _ in payloads}
+    schedule = itertools.cycle(payloads)
+    counter = itertools.count()
+    deadline = time.monotonic() + duration if duration else None
+
+    async def worker():
+        while True:
+            sequence = next(counter)
+            if requests and sequence >= requests:
+                return
+            if deadline and time.monotonic() >= deadline:
+                return
+            label, body = next(schedule)
+            # A distinct mission per request keeps the result cache from answering.
+            mission = f"load test {sequence}" if bust_cache else "load test"
+            start = time.perf_counter()
+            try:
+                response = await client.post("/analyze", files={"file": (f"{label}.csv", body)}, data={"mission": mission})
+                ok = response.status_code == 200
+                deferred = ok and response.json().get("mission_status") == "DEFERRED"
+            except httpx.HTTPError:
+                ok, deferred = False, False
+            samples[label].append(time.perf_counter() - start)
+            if not ok:
+                outcomes[label]["errors"] += 1
+            elif deferred:
+                outcomes[label]["fallbacks"] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, outcomes, time.perf_counter() - start
+
+
+def summarize(samples, outcomes, wall):
+    def block(values, errors, fallbacks):
+        count = len(values)
+        return {
+            "requests": count,
+            "rps": round(count / wall, 2) if wall else 0.0,
+            **(percentiles(values) if count else {}),
+            "error_rate": round(errors / count, 4) if count else 0.0,
+            "fallback_rate": round(fallbacks / count, 4) if count else 0.0
+        }
+
+    cases = {
+        label: block(values, outcomes[label]["errors"], outcomes[label]["fallbacks"])
+        for label, values in samples.items() if values
+    }
+    every = list(itertools.chain.from_iterable(samples.values()))
+    total = block(
+        every,
+        sum(outcome["errors"] for outcome in outcomes.values()),
+        sum(outcome["fallbacks"] for outcome in outcomes.values())
+    )
+    return total, cases
+
+
+def compare(baseline, total, cases, tolerance):
+    regressions = []
+    if not baseline:
+        return regressions
+    pairs = [("overall", baseline.get("total"), total)]
+    pairs.extend((label, baseline.get("cases", {}).get(label), case) for label, case in cases.items())
+    for label, before, after in pairs:
+        if not before or not after.get("requests"):
+            continue
+        if before["rps"] and after["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{label}: rps {before['rps']} -> {after['rps']}")
+        if before.get("p95_ms") and after["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']} ms -> {after['p95_ms']} ms")
+        if after["error_rate"] > before["error_rate"]:
+            regressions.append(f"{label}: error rate {before['error_rate']} -> {after['error_rate']}")
+    return regressions
+
+
+async def run(args, payloads):
+    server = None
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    if args.in_process:
+        from backend.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://sentinel", timeout=timeout)
+    else:
+        url = args.url
+        if not url:
+            port = free_port()
+            overrides = {} if args.cache else {"SENTINEL_RESULT_CACHE_SIZE": "0"}
+            server = start_server(port, args.workers, overrides)
+            url = f"http://127.0.0.1:{port}"
+        client = httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits)
+    try:
+        async with client:
+            if not args.in_process:
+                await wait_ready(client, args.startup_timeout)
+            if args.warmup:
+                await drive(client, payloads, args.concurrency, 0, args.warmup, not args.cache)
+            return await drive(client, payloads, args.concurrency, args.duration, args.requests, not args.cache)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="target an already running service instead of starting uvicorn")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--in-process", action="store_true", help="call the ASGI app directly (no sockets)")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds to run; 0 uses --requests")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests")
+    parser.add_argument("--warmup", type=int, default=10, help="requests sent before measuring")
+    parser.add_argument("--rows", type=int, nargs="*", default=[1_000, 100_000])
+    parser.add_argument("--metrics", type=int, default=4)
+    parser.add_argument("--scenarios", nargs="*", choices=sorted(GENERATORS), default=["normal", "high"])
+    parser.add_argument("--no-files", action="store_true", help="skip data/*.csv")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--cache", action="store_true", help="let the result cache answer repeated uploads")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed rps drop / p95 rise vs the baseline")
+    parser.add_argument("--check", action="store_true", help="exit non-zero when the run regresses")
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+    if not args.duration and not args.requests:
+        parser.error("set --duration or --requests")
+
+    payloads = build_payloads(args.rows, args.scenarios, args.metrics, args.seed, not args.no_files)
+    samples, outcomes, wall = asyncio.run(run(args, payloads))
+    total, cases = summarize(samples, outcomes, wall)
+
+    for label, case in sorted(cases.items()):
+        print(
+            f"{label:<24} {case['requests']:>7} req  {case['rps']:>9.2f} rps  p50 {case['p50_ms']:>9.2f} ms"
+            f"  p95 {case['p95_ms']:>9.2f} ms  p99 {case['p99_ms']:>9.2f} ms"
+            f"  err {case['error_rate']:.2%}  fallback {case['fallback_rate']:.2%}"
+        )
+    if not total["requests"]:
+        print("no requests completed")
+        return 1
+    print(
+        f"{'overall':<24} {total['requests']:>7} req  {total['rps']:>9.2f} rps  p50 {total['p50_ms']:>9.2f} ms"
+        f"  p95 {total['p95_ms']:>9.2f} ms  p99 {total['p99_ms']:>9.2f} ms"
+        f"  err {total['error_rate']:.2%}  fallback {total['fallback_rate']:.2%}"
+    )
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as fh:
+            baseline = json.load(fh)
+    regressions = compare(baseline, total, cases, args.tolerance)
+    for line in regressions:
+        print(f"REGRESSION {line}")
+
+    if args.save_baseline:
+        run_info = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "cpus": os.cpu_count(),
+            "concurrency": args.concurrency,
+            "workers": args.workers,
+            "in_process": args.in_process,
+            "total": total,
+            "cases": cases
+        }
+        with open(args.baseline, "w", encoding="utf-8") as fh:
+            json.dump(run_info, fh, indent=2)
+    return 1 if regressions and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Lets the tests import ``backend`` the same way uvicorn does, from this directory.
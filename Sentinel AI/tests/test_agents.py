@@ -0,0 +1,71 @@
+import random
+
+from backend.agents import LEVELS, action_agent, analyst_agent, assess_batch, risk_agent, risk_levels
+from backend.pipeline import decide, decide_batch
+
+FEATURES = ["transaction_amount", "error_rate", "latency_ms", "transaction_frequency"]
+
+
+def random_summary(rng):
+    features = []
+    for name in rng.sample(FEATURES, rng.randint(0, 3)):
+        features.append({
+            "feature": name,
+            "deviation_sigma": round(rng.uniform(0.0, 4.0), 2),
+            "direction": rng.choice(["above", "below"]),
+            "trend": rng.choice(["increasing", "decreasing", "stable", "trend unclear"])
+        })
+    return {"top_features": features, "signals": [f"{f['feature']} signal" for f in features]}
+
+
+def test_assess_batch_matches_scalar_agents():
+    rng = random.Random(7)
+    summaries = [random_summary(rng) for _ in range(5000)]
+    # Include the level boundaries exactly.
+    scores = [rng.choice([0.0, 0.33, 0.67, 1.0, rng.random()]) for _ in summaries]
+
+    batch = assess_batch(summaries, scores)
+    codes = risk_levels(summaries, scores)
+    for summary, score, assessed, code in zip(summaries, scores, batch, codes):
+        risk_level, note, modifier = risk_agent(analyst_agent(summary), score)
+        assert assessed[:3] == (risk_level, note, modifier)
+        assert assessed[3:] == action_agent(risk_level, summary)
+        assert LEVELS[code] == risk_level
+
+
+def test_decision_text_is_unchanged():
+    summary = {"top_features": [
+        {"feature": "error_rate", "deviation_sigma": 3.1, "direction": "above", "trend": "increasing"}
+    ]}
+    assert risk_agent(analyst_agent(summary), 0.2) == (
+        "HIGH", "Analyst highlighted greater pressure than score; hedging with uncertainty.", 0.75
+    )
+    assert action_agent("HIGH", summary) == (
+        "Freeze affected flows and escalate to incident lead",
+        0.9,
+        "error_rate is accelerating upward. Rapid upward pressure warrants an immediate halt.",
+        [
+            "Escalate to incident command and freeze flows",
+            "Quarantine affected services and require manual overrides",
+            "Route transactions through safe path with human approval"
+        ]
+    )
+    assert action_agent("LOW", {}) == (
+        "Continue operations with automated monitoring",
+        0.55,
+        "Signals stable; precautionary oversight recommended. No acute pressure despite anomaly flag.",
+        ["Continue with monitoring enabled", "Log deviation and re-evaluate next cycle",
+         "Notify ops lead of minor variance"]
+    )
+    assert risk_agent(analyst_agent({}), 0.5) == (
+        "MEDIUM", "Score indicates higher risk than analyst summary; conservative stance applied.", 0.85
+    )
+
+
+def test_decide_batch_matches_decide():
+    rng = random.Random(11)
+    summaries = [random_summary(rng) for _ in range(500)]
+    summaries[3]["detector"] = {"name": "forest", "fit_ms": 1.0}
+    scores = [rng.random() for _ in summaries]
+    expected = [decide(summary, score, mission="sweep") for summary, score in zip(summaries, scores)]
+    assert decide_batch(summaries, scores, mission="sweep") == expected
@@ -0,0 +1,103 @@
+import base64
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.anomaly import detect_anomalies, prepare_matrix, top_k_indices
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+@pytest.mark.parametrize("k", [0, 1, 3, 5, 8, 20])
+def test_top_k_indices_matches_stable_sort(k):
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        # Few distinct values, so ties regularly straddle the k-th place.
+        key = rng.integers(0, 4, size=rng.integers(1, 12)).astype(float)
+        expected = np.argsort(-key, kind="stable")[:k]
+        assert top_k_indices(key, k).tolist() == expected.tolist()
+
+
+def test_top_k_indices_keeps_tie_order():
+    assert top_k_indices([1.0, 2.0, 2.0, 0.5, 2.0], 2).tolist() == [1, 2]
+    assert top_k_indices([3.0, 1.0, 1.0, 1.0], 3).tolist() == [0, 1, 2]
+
+
+def mixed_frame(rows=300, seed=11):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "amount": rng.normal(100, 15, rows),
+        "count": rng.integers(0, 50, rows),
+        "ratio": rng.random(rows),
+        "empty": np.full(rows, np.nan),
+        "label": ["x"] * rows
+    })
+    df.loc[rng.choice(rows, 30, replace=False), "amount"] = np.nan
+    df.loc[rng.choice(rows, 10, replace=False), "ratio"] = np.nan
+    df["nullable"] = pd.array(rng.integers(0, 9, rows), dtype="Int64")
+    df.loc[5, "nullable"] = pd.NA
+    return df
+
+
+@pytest.mark.parametrize("block_cells", [1 << 20, 7])
+def test_prepare_matrix_matches_pandas(monkeypatch, block_cells):
+    monkeypatch.setattr("backend.anomaly.PREPARE_BLOCK_CELLS", block_cells)
+    df = mixed_frame()
+    numeric = df.select_dtypes(include="number").astype(float).dropna(axis=1, how="all")
+
+    frame, stats, raw_column = prepare_matrix(df, dtype=np.float64)
+
+    assert list(frame.columns) == list(numeric.columns)
+    assert frame.to_numpy().flags["C_CONTIGUOUS"]
+    np.testing.assert_array_equal(frame.to_numpy(), numeric.fillna(numeric.median()).to_numpy())
+    np.testing.assert_allclose(stats["mean"].to_numpy(), numeric.mean().to_numpy())
+    np.testing.assert_allclose(stats["std"].to_numpy(), numeric.std().to_numpy())
+    np.testing.assert_array_equal(stats["latest"].to_numpy(), numeric.iloc[-1].to_numpy())
+    assert raw_column("amount").isna().sum() == 30
+
+
+def test_prepare_matrix_float32_is_rounded_float64():
+    df = mixed_frame()
+    wide, _, _ = prepare_matrix(df, dtype=np.float64)
+    narrow, _, _ = prepare_matrix(df, dtype=np.float32)
+    assert narrow.to_numpy().dtype == np.float32
+    np.testing.assert_array_equal(narrow.to_numpy(), wide.to_numpy().astype(np.float32))
+
+
+def test_row_score_pages_cover_every_row():
+    df = pd.read_csv(os.path.join(DATA, "high.csv"))
+    full = detect_anomalies(df, row_scores="page", row_limit=len(df))[0]["rows"]["scores"]
+    assert full["count"] == len(df) and full["next_offset"] is None
+
+    pages, offset = [], 0
+    while offset is not None:
+        block = detect_anomalies(df, row_scores="binary", row_offset=offset, row_limit=64)[0]["rows"]["scores"]
+        assert block["offset"] == offset and block["encoding"] == "base64-float32-le"
+        decoded = np.frombuffer(base64.b64decode(block["data"]), dtype="<f4")
+        assert len(decoded) == block["count"]
+        pages.append(decoded)
+        offset = block["next_offset"]
+    assert [len(page) for page in pages] == [64, 64, 64, 8]
+    np.testing.assert_allclose(np.concatenate(pages), full["scores"], atol=1e-6)
+
+    beyond = detect_anomalies(df, row_scores="page", row_offset=len(df) + 5)[0]["rows"]["scores"]
+    assert beyond["count"] == 0 and beyond["scores"] == [] and beyond["next_offset"] is None
+
+
+def test_top_anomalies_are_the_lowest_scores():
+    df = pd.read_csv(os.path.join(DATA, "high.csv"))
+    rows = detect_anomalies(df, top_rows=5, row_scores="page", row_limit=len(df))[0]["rows"]
+    scores = np.asarray(rows["scores"]["scores"])
+    top = rows["top_anomalies"]
+    picked = [entry["row"] for entry in top]
+    # Page scores are rounded, so compare against the rest rather than an exact sort order.
+    assert len(set(picked)) == 5
+    assert [entry["score"] for entry in top] == sorted(entry["score"] for entry in top)
+    assert max(entry["score"] for entry in top) <= np.delete(scores, picked).min() + 1e-6
+    for entry in top:
+        assert entry["score"] == pytest.approx(scores[entry["row"]], abs=1e-6)
+        assert 0 < len(entry["contributions"]) <= 4
+    with pytest.raises(ValueError):
+        detect_anomalies(df, row_scores="csv")
@@ -0,0 +1,50 @@
+import io
+import json
+import os
+import zipfile
+
+import pytest
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import main
+    from backend.audit import AuditLog
+
+    monkeypatch.setattr(main, "AUDIT_LOG", AuditLog(tmp_path / "audit"))
+    monkeypatch.setattr(main, "WARMUP_DETECTORS", [])
+    monkeypatch.setenv("SENTINEL_BATCH_WORKERS", "1")
+    main.RESULT_CACHE.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def upload(name):
+    with open(os.path.join(DATA, name), "rb") as fh:
+        return fh.read()
+
+
+def test_every_decision_path_is_audited(client):
+    body = upload("high.csv")
+    responses = [client.post("/analyze", files={"file": ("high.csv", body)}) for _ in range(2)]
+    assert [response.headers.get("X-Sentinel-Cache") for response in responses] == ["miss", "hit"]
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("normal.csv", upload("normal.csv"))
+        zf.writestr("medium.csv", upload("medium.csv"))
+    assert client.post("/analyze/batch", files={"files": ("fleet.zip", archive.getvalue())}).status_code == 200
+
+    assert client.post("/feeds/payments/rows", files={"file": ("rows.csv", body)}).status_code == 200
+    with client.websocket_connect("/feeds/ledger/live") as websocket:
+        websocket.send_text(json.dumps({"rows": [{"a": 1.0, "b": 2.0}, {"a": 1.5, "b": 2.5}, {"a": 9.0, "b": 0.1}]}))
+        assert websocket.receive_json()["type"] == "decision"
+
+    audit = client.get("/audit").json()
+    assert audit["matches"] == 6
+    assert sorted(record["feed"] or "" for record in audit["records"]) == [
+        "", "", "ledger", "medium", "normal", "payments"
+    ]
@@ -0,0 +1,70 @@
+from backend.audit import RECORD, AuditLog, DecisionRecord
+
+
+def decision(level, action="Hold", signal="error_rate spike", status="COMPLETED", confidence=0.8):
+    return {
+        "risk_level": level,
+        "recommended_action": action,
+        "signals": [signal],
+        "mission_brief": "Protect payouts",
+        "mission_status": status,
+        "confidence": confidence
+    }
+
+
+def test_record_round_trip():
+    record = DecisionRecord(1700000000.25, 3, 4, 5, 6, 2, 1, 0.75, direction=2, trend=3, sigma=2.5)
+    payload = record.pack()
+    assert len(payload) == RECORD.size == 36
+    restored = DecisionRecord.unpack(payload)
+    assert [getattr(restored, name) for name in DecisionRecord.__slots__] == [
+        1700000000.25, 3, 4, 5, 6, 2, 1, 2, 3, 0.75, 2.5
+    ]
+
+
+def test_log_round_trip_across_instances(tmp_path):
+    log = AuditLog(tmp_path)
+    log.append(decision("LOW"), feed="payments", ts=100.0)
+    log.append(decision("HIGH", status="DEFERRED", confidence=0.6), feed="payments", ts=200.0)
+    log.append(decision("HIGH", signal=None), feed="ledger", ts=300.0)
+    assert log.append({"risk_level": None}) is None
+
+    reopened = AuditLog(tmp_path)
+    assert len(reopened) == 3
+    total, records = reopened.query(feed="payments")
+    assert total == 2
+    assert records[0] == {
+        "ts": 200.0,
+        "feed": "payments",
+        "risk_level": "HIGH",
+        "recommended_action": "Hold",
+        "confidence": 0.6,
+        "signal": "error_rate spike",
+        "deviation_sigma": None,
+        "mission_brief": "Protect payouts",
+        "mission_status": "DEFERRED"
+    }
+    assert reopened.query(risk_level="HIGH", since=250.0)[1][0]["feed"] == "ledger"
+    assert reopened.query(risk_level="HIGH", since=250.0)[1][0]["signal"] is None
+    assert reopened.query(feed="unknown") == (0, [])
+
+    # Appends from one instance are visible to the other on its next query.
+    log.append(decision("MEDIUM"), feed="ledger", ts=400.0)
+    assert reopened.query(feed="ledger")[0] == 2
+    assert reopened.stats()["by_risk_level"] == {"LOW": 1, "MEDIUM": 1, "HIGH": 2}
+
+
+def test_feature_signals_do_not_grow_the_string_table(tmp_path):
+    log = AuditLog(tmp_path)
+    for idx in range(50):
+        signal = f"latency_ms running {'above' if idx % 2 else 'below'} baseline ({idx * 0.37:.2f}σ) with stable trend"
+        log.append(decision("HIGH", signal=signal), feed="payments", ts=float(idx))
+    log.append(decision("LOW", signal="error_rate running above baseline (nanσ) with trend unclear trend"), ts=60.0)
+    # Feed, mission, action and two feature names.
+    assert log.stats()["strings"] == 5
+
+    _, records = AuditLog(tmp_path).query(limit=3)
+    assert records[0]["signal"] == "error_rate running above baseline (nanσ) with trend unclear trend"
+    assert records[1]["signal"] == "latency_ms running above baseline (18.13σ) with stable trend"
+    assert records[1]["deviation_sigma"] == 18.13
+    assert records[2]["signal"] == "latency_ms running below baseline (17.76σ) with stable trend"
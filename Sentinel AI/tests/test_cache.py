@@ -0,0 +1,91 @@
+import os
+
+from backend.cache import ResultCache, result_key
+from backend.store import FileStore, MemoryStore, load_store
+
+
+def test_local_hits_are_copies():
+    cache = ResultCache(capacity=4)
+    cache.put("k", {"risk_level": "HIGH"})
+    cache.get("k")["timings"] = {"pipeline": 1.0}
+    assert cache.get("k") == {"risk_level": "HIGH"}
+
+
+def test_shared_hits_are_copies():
+    store = MemoryStore()
+    ResultCache(capacity=4, store=store).put("k", {"risk_level": "HIGH"})
+
+    sibling = ResultCache(capacity=4, store=store)
+    first = sibling.get("k")
+    first["timings"] = {"cache_lookup": 0.1}
+    assert sibling.get("k") == {"risk_level": "HIGH"}
+    stats = sibling.stats()
+    assert (stats["hits"], stats["shared_hits"], stats["misses"]) == (2, 1, 0)
+
+
+def test_miss_and_key_options():
+    cache = ResultCache(capacity=4, store=MemoryStore())
+    assert cache.get("absent") is None
+    assert cache.stats()["misses"] == 1
+    assert result_key("d", "m", chunked=True) != result_key("d", "m", chunked=False)
+
+
+def test_file_store_prunes_expired_and_oversized_entries(tmp_path):
+    store = FileStore(tmp_path, max_bytes=3 * (8 + 100), prune_every=1000)
+    store.set("expired", b"x" * 100, ttl=-1)
+    for idx in range(4):
+        store.set(f"model:{idx}", b"x" * 100)
+        os.utime(store._path(f"model:{idx}"), (idx, idx))
+    # A read refreshes the entry, so it outlives newer writes.
+    assert store.get("model:0") == b"x" * 100
+
+    assert store.prune() == 2
+    assert store.get("expired") is None
+    assert store.get("model:1") is None
+    assert [store.get(f"model:{idx}") is not None for idx in (0, 2, 3)] == [True, True, True]
+
+
+def test_file_store_prunes_every_n_writes(tmp_path):
+    store = FileStore(tmp_path, prune_every=2)
+    store.set("a", b"1", ttl=-1)
+    assert os.path.exists(store._path("a"))
+    store.set("b", b"2")
+    assert not os.path.exists(store._path("a"))
+
+
+def test_load_store_specs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert isinstance(load_store("backend.store:MemoryStore"), MemoryStore)
+    assert isinstance(load_store("memory://"), MemoryStore)
+    # Windows paths have a colon but are directories, not module:factory specs.
+    for spec in ("C:\\sentinel\\store", "D:/sentinel/store", str(tmp_path / "store"), f"file://{tmp_path}/uri"):
+        assert isinstance(load_store(spec, max_bytes=10), FileStore)
+    assert load_store(None) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("backend.cache.time.monotonic", lambda: clock[0])
+    cache = ResultCache(capacity=4, ttl_seconds=30)
+    cache.put("k", {"risk_level": "LOW"})
+    clock[0] += 29.9
+    assert cache.get("k") == {"risk_level": "LOW"}
+    clock[0] += 0.1
+    assert cache.get("k") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["expirations"], stats["hits"], stats["misses"]) == (0, 1, 1, 1)
+
+
+def test_capacity_evicts_the_least_recently_used():
+    cache = ResultCache(capacity=3)
+    for key in "abc":
+        cache.put(key, {"key": key})
+    cache.get("a")
+    cache.put("d", {"key": "d"})
+    assert cache.get("b") is None
+    assert [cache.get(key)["key"] for key in "acd"] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1 and cache.stats()["size"] == 3
+
+    disabled = ResultCache(capacity=0)
+    disabled.put("k", {"risk_level": "LOW"})
+    assert not disabled.enabled and disabled.get("k") is None
@@ -0,0 +1,118 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend import anomaly
+from backend.anomaly import DETECTORS, ForestDetector, detect_anomalies, fit_detector, fit_sample, select_detector
+from backend.streaming import StreamingAnalyzer
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def baseline(rows=400, seed=8):
+    return np.random.default_rng(seed).normal(size=(rows, 4))
+
+
+@pytest.mark.parametrize("name", sorted(DETECTORS))
+def test_outliers_score_lower(name):
+    model = fit_detector(name, baseline())
+    normal = np.zeros((5, 4))
+    # Repeated outliers, so the EWMA statistic has time to move away from the centre.
+    outliers = np.full((5, 4), 8.0)
+    scores = model.decision_function(np.vstack([normal, outliers]))
+    assert scores.shape == (10,)
+    assert scores[5:].max() < scores[:5].min()
+    assert model.name == name and model.fit_ms >= 0
+
+
+def test_robust_z_is_the_largest_mad_distance():
+    model = fit_detector("robust-z", np.array([[0.0, 10.0], [1.0, 12.0], [2.0, 14.0], [3.0, 16.0], [4.0, 18.0]]))
+    # Medians 2 and 14, MADs 1 and 2 (scaled by 1.4826).
+    scores = model.decision_function(np.array([[2.0, 14.0], [5.0, 14.0], [2.0, 22.0]]))
+    np.testing.assert_allclose(scores, [0.0, -3 / 1.4826, -4 / 1.4826])
+
+
+def test_forest_lite_is_a_smaller_forest():
+    model = fit_detector("forest-lite", baseline())
+    assert len(model.model.estimators_) == 25
+    assert model.model.max_samples_ == 64
+
+
+@pytest.mark.parametrize("sizes", [[300], [1] * 20 + [280], [7, 13, 100, 180]])
+def test_ewma_stream_matches_one_pass(sizes):
+    rows = baseline(300, seed=9)
+    model = fit_detector("ewma", baseline())
+    expected = model.decision_function(rows)
+    state, parts, start = None, [], 0
+    for size in sizes:
+        scores, state = model.score_stream(rows[start:start + size], state)
+        parts.append(scores)
+        start += size
+    np.testing.assert_allclose(np.concatenate(parts), expected, rtol=1e-12)
+
+
+def test_streaming_ewma_matches_detect_anomalies():
+    df = pd.read_csv(os.path.join(DATA, "high.csv"))
+    analyzer = StreamingAnalyzer(baseline_rows=100, detector="ewma")
+    for start in range(0, len(df), 10):
+        analyzer.update(df.iloc[start:start + 10])
+    expected = detect_anomalies(df, detector="ewma", baseline_rows=100)[1]
+    assert analyzer.summarize()[1] == pytest.approx(expected, abs=1e-6)
+
+
+def test_auto_thresholds():
+    assert select_detector(None) == "forest"
+    assert select_detector("auto", anomaly.AUTO_LITE_ROWS - 1) == "forest"
+    assert select_detector("auto", anomaly.AUTO_LITE_ROWS) == "forest-lite"
+    assert select_detector("auto", anomaly.AUTO_ROBUST_ROWS) == "robust-z"
+    assert select_detector("ewma", anomaly.AUTO_ROBUST_ROWS) == "ewma"
+    with pytest.raises(ValueError):
+        select_detector("svm")
+
+
+@pytest.mark.parametrize("name", ["forest", "robust-z", "ewma"])
+def test_cost_block(name):
+    df = pd.read_csv(os.path.join(DATA, "medium.csv"))
+    summary, _ = detect_anomalies(df, detector=name)
+    cost = summary["detector"]
+    assert set(cost) == {"name", "fit_ms", "score_ms", "cached", "input_bytes"}
+    assert cost["name"] == name and cost["cached"] is False
+    assert cost["fit_ms"] >= 0 and cost["score_ms"] >= 0
+    assert cost["input_bytes"] == len(df) * df.shape[1] * anomaly.PREPARE_DTYPE.itemsize
+
+
+@pytest.mark.parametrize("name", ["forest", "robust-z", "ewma"])
+def test_threaded_chunk_scoring_matches_one_thread(name, monkeypatch):
+    rows = baseline(1000, seed=3)
+    model = fit_detector(name, baseline())
+    expected = model.decision_function(rows)
+    monkeypatch.setattr(anomaly, "SCORE_THREADS", 4)
+    monkeypatch.setattr(anomaly, "SCORE_CHUNK_ROWS", 97)
+    monkeypatch.setattr(anomaly, "_SCORE_POOL", None)
+    try:
+        np.testing.assert_array_equal(model.decision_function(rows), expected)
+    finally:
+        if anomaly._SCORE_POOL is not None:
+            anomaly._SCORE_POOL.shutdown()
+
+
+def test_forest_scores_do_not_depend_on_n_jobs():
+    rows = baseline(300, seed=4)
+    serial = ForestDetector(n_jobs=1).fit(baseline()).decision_function(rows)
+    parallel = ForestDetector(n_jobs=3).fit(baseline()).decision_function(rows)
+    np.testing.assert_array_equal(parallel, serial)
+
+
+def test_fit_sample_is_seeded_and_ordered():
+    frame = pd.DataFrame({"value": np.arange(1000)})
+    first = fit_sample(frame, limit=100, seed=5)
+    assert len(first) == 100
+    assert first["value"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(fit_sample(frame, limit=100, seed=5), first)
+    assert not fit_sample(frame, limit=100, seed=6).equals(first)
+    np.testing.assert_array_equal(fit_sample(frame.to_numpy(), limit=100, seed=5), first.to_numpy())
+    # Limits at or above the baseline, and 0, keep every row.
+    assert fit_sample(frame, limit=1000, seed=5) is frame
+    assert fit_sample(frame, limit=0) is frame
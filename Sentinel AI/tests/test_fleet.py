@@ -0,0 +1,48 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.anomaly import detect_anomalies
+from backend.batch import analyze_feed, decide_fleet, score_feed
+from backend.fleet import detect_fleet, stack_feeds
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+SCENARIOS = ("normal", "medium", "high")
+
+
+def read(name):
+    with open(os.path.join(DATA, f"{name}.csv"), "rb") as fh:
+        return fh.read()
+
+
+def test_fleet_summaries_match_detect_anomalies():
+    rng = np.random.default_rng(5)
+    frames = [pd.read_csv(os.path.join(DATA, f"{name}.csv")) for name in SCENARIOS]
+    # Ragged lengths, a missing column and gaps exercise the padding.
+    frames.append(frames[2].head(37).drop(columns=["latency_ms"]))
+    gappy = frames[0].copy()
+    gappy.loc[rng.choice(len(gappy), 20, replace=False), "error_rate"] = np.nan
+    frames.append(gappy)
+
+    stacked, columns, lengths = stack_feeds(frames)
+    for frame, summary in zip(frames, detect_fleet(stacked, columns, lengths, include_stats=True)):
+        expected, _ = detect_anomalies(frame)
+        assert summary["top_features"] == expected["top_features"]
+        assert summary["signals"] == expected["signals"]
+        assert list(summary["mean"]) == list(expected["mean"])
+        np.testing.assert_allclose(list(summary["mean"].values()), list(expected["mean"].values()), rtol=1e-12)
+
+
+def test_fleet_batch_decisions_match_per_feed_pipeline():
+    feeds = {name: read(name) for name in SCENARIOS}
+    feeds["empty"] = b""
+    feeds["text"] = b"a,b\nx,y\nz,w\n"
+
+    scored = [score_feed(name, data) for name, data in feeds.items()]
+    fleet = {name: result for name, result, _, _ in decide_fleet(scored, mission="sweep")}
+    for name, data in feeds.items():
+        _, expected, _, _ = analyze_feed(name, data, mission="sweep")
+        expected.pop("detector", None)
+        fleet[name].pop("detector", None)
+        assert fleet[name] == expected
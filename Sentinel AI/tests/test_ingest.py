@@ -0,0 +1,115 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.ingest import IngestError, detect_format, iter_numeric_chunks, read_table
+from backend.pipeline import run_pipeline, run_pipeline_chunked
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+SCENARIOS = ("normal", "medium", "high")
+
+
+def read(name):
+    with open(os.path.join(DATA, f"{name}.csv"), "rb") as fh:
+        return fh.read()
+
+
+def without_cost(decision):
+    decision.pop("detector", None)
+    return decision
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+@pytest.mark.parametrize("baseline_rows", [None, 120])
+def test_chunked_pipeline_matches_full_pipeline(name, baseline_rows):
+    data = read(name)
+    df = pd.read_csv(io.BytesIO(data))
+    rows = baseline_rows or len(df)
+
+    chunked = run_pipeline_chunked(io.BytesIO(data), mission="sweep", chunk_rows=33, baseline_rows=rows)
+    full = run_pipeline(df, mission="sweep", baseline_rows=rows)
+    assert full["mission_status"] == "COMPLETED"
+    assert without_cost(chunked) == without_cost(full)
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_chunked_defaults_match_full_pipeline(name):
+    # The endpoint default: no baseline_rows and an upload shorter than one batch.
+    data = read(name)
+    chunked = run_pipeline_chunked(io.BytesIO(data))
+    full = run_pipeline(pd.read_csv(io.BytesIO(data)))
+    assert full["mission_status"] == "COMPLETED"
+    assert without_cost(chunked) == without_cost(full)
+
+
+def test_chunks_keep_the_first_batch_columns():
+    data = b"a,b,label\n1,2,x\n3,4,y\n5,6,z\n7,8,w\n9,10,v\n"
+    chunks = list(iter_numeric_chunks(io.BytesIO(data), chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert all(list(chunk.columns) == ["a", "b"] for chunk in chunks)
+    assert pd.concat(chunks)["b"].tolist() == [2, 4, 6, 8, 10]
+
+
+@pytest.fixture()
+def frame():
+    df = pd.read_csv(os.path.join(DATA, "medium.csv"))
+    df["label"] = "ops"
+    return df
+
+
+def columnar(df, fmt, tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    path = tmp_path / f"feed.{fmt}"
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, row_group_size=64)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, path, chunksize=64)
+    return path
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "arrow"])
+def test_columnar_uploads_match_csv(frame, fmt, tmp_path):
+    path = columnar(frame, fmt, tmp_path)
+    numeric = frame.select_dtypes(include="number")
+    with open(path, "rb") as fh:
+        # Uploads arrive as file objects and are spooled to disk for memory mapping.
+        pd.testing.assert_frame_equal(read_table(fh, fmt), numeric)
+    chunks = list(iter_numeric_chunks(path, chunk_rows=50, fmt=fmt))
+    assert max(len(chunk) for chunk in chunks) <= 50
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), numeric)
+
+
+def test_npy_uploads(frame, tmp_path):
+    numeric = frame.select_dtypes(include="number")
+    plain = tmp_path / "plain.npy"
+    np.save(plain, numeric.to_numpy())
+    df = read_table(plain, "npy")
+    assert list(df.columns) == [f"metric_{idx}" for idx in range(numeric.shape[1])]
+    np.testing.assert_array_equal(df.to_numpy(), numeric.to_numpy())
+
+    structured = tmp_path / "structured.npy"
+    np.save(structured, numeric.to_records(index=False))
+    pd.testing.assert_frame_equal(read_table(structured, "npy"), numeric)
+    chunks = list(iter_numeric_chunks(structured, chunk_rows=64, fmt="npy"))
+    pd.testing.assert_frame_equal(pd.concat(chunks), numeric)
+
+    strings = tmp_path / "strings.npy"
+    np.save(strings, np.array([["a", "b"]]))
+    with pytest.raises(IngestError):
+        read_table(strings, "npy")
+
+
+def test_detect_format():
+    assert detect_format("feed.parquet") == "parquet"
+    assert detect_format("feed.feather") == "arrow"
+    assert detect_format("upload", "application/vnd.apache.arrow.stream") == "arrow"
+    assert detect_format("feed.bin") == "csv"
+    assert detect_format("feed.csv", override=".npy") == "npy"
+    with pytest.raises(IngestError):
+        detect_format("feed.csv", override="xlsx")
@@ -0,0 +1,84 @@
+import os
+import threading
+
+import pytest
+
+from backend.jobs import DONE, FAILED, JobQueue, QueueFull
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def test_submit_and_poll():
+    queue = JobQueue(workers=1)
+    done = queue.submit(lambda value: {"value": value}, 3)
+    failed = queue.submit(lambda: 1 / 0)
+    done.future.result(timeout=10)
+    failed.future.result(timeout=10)
+
+    assert queue.get(done.id).to_dict()["result"] == {"value": 3}
+    assert failed.status == FAILED and failed.error.startswith("ZeroDivisionError")
+    assert queue.stats()["completed"] == 1 and queue.stats()["failed"] == 1 and queue.depth() == 0
+    queue.shutdown()
+
+
+def test_full_queue_rejects_and_recovers():
+    release = threading.Event()
+    cleaned = []
+    queue = JobQueue(workers=1, max_pending=2)
+    blocked = [queue.submit(release.wait, 10, cleanup=lambda: cleaned.append(1)) for _ in range(2)]
+    with pytest.raises(QueueFull):
+        queue.submit(release.wait, 10)
+    assert queue.stats()["rejected"] == 1
+
+    release.set()
+    for job in blocked:
+        job.future.result(timeout=10)
+    assert [job.status for job in blocked] == [DONE, DONE] and cleaned == [1, 1]
+    assert queue.submit(lambda: "ok").future.result(timeout=10).result == "ok"
+    queue.shutdown()
+
+
+def test_queue_outlives_shutdown():
+    started, release = threading.Event(), threading.Event()
+    cleaned = []
+    queue = JobQueue(workers=1)
+    running = queue.submit(lambda: started.set() or release.wait(10))
+    started.wait(10)
+    queued = queue.submit(lambda: "never", cleanup=lambda: cleaned.append(1))
+    queue.shutdown()
+    release.set()
+    running.future.result(timeout=10)
+
+    assert queued.status == FAILED and cleaned == [1] and queue.depth() == 0
+    assert queue.submit(lambda: "again").future.result(timeout=10).result == "again"
+    queue.shutdown()
+
+
+def test_failed_submit_releases_its_slot():
+    class Closed:
+        def submit(self, *args, **kwargs):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    queue = JobQueue(workers=1, max_pending=1)
+    queue._executor = Closed()
+    for _ in range(3):
+        with pytest.raises(RuntimeError):
+            queue.submit(lambda: None)
+    assert queue.depth() == 0 and queue.stats()["tracked"] == 0
+
+
+def test_jobs_endpoint_across_app_lifespans(monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend import main
+
+    monkeypatch.setattr(main, "WARMUP_DETECTORS", [])
+    with open(os.path.join(DATA, "high.csv"), "rb") as fh:
+        body = fh.read()
+    for _ in range(2):
+        with TestClient(main.app) as client:
+            submitted = client.post("/jobs", files={"file": ("high.csv", body)}, data={"mission": "sweep"})
+            assert submitted.status_code == 202
+            result = client.get(f"/jobs/{submitted.json()['job_id']}/result", params={"wait": 30})
+            assert result.status_code == 200
+            assert result.json()["mission_brief"] == "sweep"
+            assert client.get("/jobs/unknown").status_code == 404
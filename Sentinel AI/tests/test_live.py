@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from backend.ingest import IngestError
+from backend.live import LiveHub, decision_key, parse_rows
+
+
+def key(level, *features):
+    return decision_key(level, {"top_features": [{"feature": feature} for feature in features]})
+
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get_nowait()["decision"])
+    return messages
+
+
+def test_repeats_are_suppressed():
+    async def scenario():
+        hub = LiveHub(debounce=0.0)
+        queue = hub.subscribe("payments")
+        assert hub.publish("payments", "a", key("HIGH", "x")) is True
+        assert hub.publish("payments", "b", key("HIGH", "x")) is False
+        assert hub.publish("payments", "c", key("HIGH", "y")) is True
+        assert hub.publish("unwatched", "d", key("LOW")) is False
+        return drain(queue), hub.stats()
+
+    messages, stats = asyncio.run(scenario())
+    assert messages == ["a", "c"]
+    assert (stats["pushed"], stats["suppressed"]) == (2, 1)
+
+
+def test_change_inside_the_window_arrives_when_it_closes():
+    async def scenario():
+        hub = LiveHub(debounce=0.05)
+        queue = hub.subscribe("payments")
+        hub.publish("payments", "first", key("LOW"))
+        assert hub.publish("payments", "second", key("MEDIUM")) is False
+        assert hub.publish("payments", "latest", key("HIGH")) is False
+        assert drain(queue) == ["first"]
+        await asyncio.sleep(0.15)
+        return drain(queue), hub.stats()
+
+    messages, stats = asyncio.run(scenario())
+    # Only the latest decision in the window is delivered.
+    assert messages == ["latest"]
+    assert (stats["pushed"], stats["suppressed"]) == (2, 1)
+
+
+def test_pending_push_is_dropped_when_the_state_reverts():
+    async def scenario():
+        hub = LiveHub(debounce=0.05)
+        queue = hub.subscribe("payments")
+        hub.publish("payments", "first", key("LOW", "x"))
+        hub.publish("payments", "spike", key("HIGH", "x"))
+        assert hub.publish("payments", "back", key("LOW", "x")) is False
+        await asyncio.sleep(0.15)
+        return drain(queue), hub.stats()
+
+    messages, stats = asyncio.run(scenario())
+    assert messages == ["first"]
+    assert (stats["pushed"], stats["suppressed"]) == (1, 2)
+
+
+def test_full_subscriber_queue_drops_the_oldest():
+    async def scenario():
+        hub = LiveHub(debounce=0.0, queue_size=2)
+        slow = hub.subscribe("payments")
+        for idx, level in enumerate(["LOW", "MEDIUM", "HIGH", "LOW"]):
+            hub.publish("payments", idx, key(level))
+        hub.unsubscribe("payments", slow)
+        return drain(slow), hub.stats()
+
+    messages, stats = asyncio.run(scenario())
+    assert messages == [2, 3]
+    assert stats["feeds"] == 0 and stats["subscribers"] == 0
+
+
+def test_parse_rows():
+    assert parse_rows('{"a": 1}')["a"].tolist() == [1]
+    assert len(parse_rows('[{"a": 1}, {"a": 2}]')) == 2
+    assert len(parse_rows('{"rows": [{"a": 1}, {"a": 2}, {"a": 3}]}')) == 3
+    for bad in ("not json", "[1, 2]", '{"rows": 5}'):
+        with pytest.raises(IngestError):
+            parse_rows(bad)
@@ -0,0 +1,29 @@
+import pytest
+
+from backend.metrics import METRICS, muted_stages, stage
+from backend.pipeline import warm_up
+
+
+def stage_lines(name):
+    return [line for line in METRICS.render().splitlines() if f'stage="{name}"' in line]
+
+
+def test_muted_stages_are_not_recorded():
+    with muted_stages():
+        with stage("test_muted"):
+            pass
+        with pytest.raises(ValueError), stage("test_muted"):
+            raise ValueError("boom")
+    assert stage_lines("test_muted") == []
+    with stage("test_muted"):
+        pass
+    assert stage_lines("test_muted")
+
+
+def test_warm_up_records_only_its_own_stage():
+    before = {line for line in METRICS.render().splitlines() if "sentinel_stage_seconds_count" in line}
+    warmed = warm_up(("robust-z",), rows=32)
+    after = {line for line in METRICS.render().splitlines() if "sentinel_stage_seconds_count" in line}
+    assert set(warmed) == {"robust-z"}
+    assert [line for line in after - before if 'stage="warmup"' not in line] == []
+    assert stage_lines("warmup")
@@ -0,0 +1,42 @@
+import os
+
+import pandas as pd
+import pytest
+
+from backend.pipeline import run_pipeline
+from backend.profiles import ProfileStore, build_profile, detect_with_profile
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+@pytest.fixture(scope="module")
+def profile(tmp_path_factory):
+    store = ProfileStore(tmp_path_factory.mktemp("profiles"))
+    store.save(build_profile("normal-ops", pd.read_csv(os.path.join(DATA, "normal.csv"))))
+    # Read back through a fresh store, as a worker would.
+    return ProfileStore(store.root).get("normal-ops")
+
+
+def test_profile_scores_anomalous_upload_high(profile):
+    normal, normal_score = detect_with_profile(pd.read_csv(os.path.join(DATA, "normal.csv")), profile)
+    high, high_score = detect_with_profile(pd.read_csv(os.path.join(DATA, "high.csv")), profile)
+    assert high_score > normal_score
+    assert high["detector"]["profile"] == "normal-ops"
+    assert high["detector"]["fit_ms"] == 0.0
+
+
+def test_partial_column_upload(profile):
+    df = pd.read_csv(os.path.join(DATA, "high.csv"))[["transaction_amount"]]
+    summary, _ = detect_with_profile(df, profile, top_rows=3)
+    assert [feature["feature"] for feature in summary["top_features"]] == ["transaction_amount"]
+    assert sorted(summary["detector"]["missing_columns"]) == ["error_rate", "latency_ms", "transaction_frequency"]
+    assert list(summary["mean"]) == ["transaction_amount"]
+    assert list(summary["rows"]["top_anomalies"][0]["contributions"]) == ["transaction_amount"]
+
+    result = run_pipeline(df, profile=profile)
+    assert result["mission_status"] == "COMPLETED"
+
+
+def test_upload_without_profile_columns_is_rejected(profile):
+    with pytest.raises(ValueError):
+        detect_with_profile(pd.DataFrame({"other": [1.0, 2.0, 3.0]}), profile)
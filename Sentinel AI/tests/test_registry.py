@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from backend.anomaly import detect_anomalies
+from backend.registry import ModelRegistry, schema_key
+from backend.store import FileStore
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def read(name):
+    return pd.read_csv(os.path.join(DATA, f"{name}.csv"))
+
+
+def test_repeat_upload_reuses_the_fitted_model():
+    registry = ModelRegistry(capacity=4)
+    first, first_score = detect_anomalies(read("high"), registry=registry, feed="payments", baseline_rows=100)
+    second, second_score = detect_anomalies(read("high"), registry=registry, feed="payments", baseline_rows=100)
+    assert first["detector"]["cached"] is False and first["detector"]["fit_ms"] > 0
+    assert second["detector"]["cached"] is True and second["detector"]["fit_ms"] == 0.0
+    assert second_score == first_score
+    assert (registry.stats()["hits"], registry.stats()["misses"]) == (1, 1)
+
+    # Another feed, window or column layout fits its own model.
+    detect_anomalies(read("high"), registry=registry, feed="ledger", baseline_rows=100)
+    detect_anomalies(read("high"), registry=registry, feed="payments", baseline_rows=150)
+    detect_anomalies(read("high").drop(columns=["latency_ms"]), registry=registry, feed="payments", baseline_rows=100)
+    assert (registry.stats()["hits"], registry.stats()["misses"]) == (1, 4)
+
+
+def test_schema_key():
+    assert schema_key(["a", "b"], 100, "f") == schema_key(["a", "b"], 100, "f")
+    assert schema_key(["a", "b"], 100, "f") != schema_key(["b", "a"], 100, "f")
+    assert schema_key(["a", "b"], None, None, "ewma").startswith("*|ewma|all|")
+
+
+def test_lru_eviction_respects_capacity():
+    registry = ModelRegistry(capacity=2)
+    fits = []
+    for key in ["a", "b", "a", "c", "b"]:
+        registry.get_or_fit(key, lambda key=key: fits.append(key) or key)
+    # "a" was used after "b", so "b" was evicted by "c" and fitted again.
+    assert fits == ["a", "b", "c", "b"]
+    stats = registry.stats()
+    assert (stats["size"], stats["evictions"], stats["hits"], stats["misses"]) == (2, 2, 1, 4)
+    assert registry.get("a") is None
+
+
+def test_models_reload_from_a_shared_store(tmp_path):
+    rows = np.random.default_rng(1).normal(size=(200, 3))
+    df = pd.DataFrame(rows, columns=["a", "b", "c"])
+    for make in (lambda: ModelRegistry(store=FileStore(tmp_path / "store")),
+                 lambda: ModelRegistry(persist_dir=str(tmp_path / "models"))):
+        fitted, score = detect_anomalies(df, registry=make(), feed="f")
+        # A fresh registry, as in a restarted or sibling worker, loads the model instead of fitting.
+        sibling = make()
+        reloaded, reloaded_score = detect_anomalies(df, registry=sibling, feed="f")
+        assert fitted["detector"]["cached"] is False and reloaded["detector"]["cached"] is True
+        assert reloaded_score == score
+        assert sibling.stats()["shared_hits"] == 1 and sibling.stats()["persistent"] is True
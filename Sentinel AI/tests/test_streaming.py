@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.anomaly import detect_anomalies
+from backend.streaming import StreamingAnalyzer
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def history(name="high"):
+    df = pd.read_csv(os.path.join(DATA, f"{name}.csv"))
+    rng = np.random.default_rng(2)
+    # Gaps exercise the NaN-skipping merge.
+    df.loc[rng.choice(len(df), 15, replace=False), "error_rate"] = np.nan
+    return df
+
+
+def feed(analyzer, df, sizes):
+    start = 0
+    for size in sizes:
+        analyzer.update(df.iloc[start:start + size])
+        start += size
+    analyzer.update(df.iloc[start:])
+    return analyzer
+
+
+@pytest.mark.parametrize("name", ["normal", "high"])
+def test_running_stats_match_full_history(name):
+    df = history(name)
+    # Uneven chunks, including single rows, crossing the trend buffer boundaries.
+    summary, score = feed(StreamingAnalyzer(baseline_rows=len(df)), df, [1, 3, 1, 40, 7, 100]).summarize()
+    expected, expected_score = detect_anomalies(df)
+
+    assert list(summary["mean"]) == list(expected["mean"])
+    np.testing.assert_allclose(list(summary["mean"].values()), list(expected["mean"].values()), rtol=1e-12)
+    np.testing.assert_allclose(list(summary["std"].values()), list(expected["std"].values()), rtol=1e-10)
+    assert summary["top_features"] == expected["top_features"]
+    assert summary["signals"] == expected["signals"]
+    assert score == pytest.approx(expected_score, abs=1e-6)
+
+
+def test_score_is_neutral_until_the_baseline_fills():
+    df = history()
+    analyzer = StreamingAnalyzer(baseline_rows=50)
+    for idx in range(49):
+        analyzer.update(df.iloc[[idx]])
+        assert analyzer.summarize()[1] == 0.5
+    assert analyzer._model is None
+
+    analyzer.update(df.iloc[49:60])
+    assert analyzer._model is not None
+    assert analyzer.summarize()[1] != 0.5
+
+
+def test_finish_fits_a_short_bounded_source():
+    df = history()
+    analyzer = feed(StreamingAnalyzer(baseline_rows=10_000), df, [50, 50])
+    assert analyzer.summarize()[1] == 0.5
+
+    _, score = analyzer.finish().summarize()
+    assert score == pytest.approx(detect_anomalies(df)[1], abs=1e-6)
+    # A second finish, or one after the baseline filled, changes nothing.
+    assert analyzer.finish().summarize()[1] == score
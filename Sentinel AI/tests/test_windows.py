@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.anomaly import detect_anomalies, normalize_scores, score_rows
+from backend.windows import detect_windows, window_bounds
+
+DATA = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def long_history():
+    df = pd.concat([pd.read_csv(os.path.join(DATA, f"{name}.csv")) for name in ("normal", "medium", "high")],
+                   ignore_index=True)
+    rng = np.random.default_rng(4)
+    df.loc[rng.choice(len(df), 40, replace=False), "latency_ms"] = np.nan
+    return df
+
+
+def test_window_bounds_close_on_the_latest_row():
+    starts, ends = window_bounds(10, 4, 3)
+    assert starts.tolist() == [0, 3, 6] and ends.tolist() == [4, 7, 10]
+    starts, ends = window_bounds(11, 4, 3)
+    assert starts.tolist() == [0, 3, 6, 7] and ends[-1] == 11
+    starts, ends = window_bounds(5, 50)
+    assert starts.tolist() == [0] and ends.tolist() == [5]
+
+
+@pytest.mark.parametrize("window, stride", [(100, None), (120, 37), (25, 50)])
+def test_prefix_sum_windows_match_recomputation(window, stride):
+    df = long_history()
+    timeline, _ = detect_windows(df, window=window, stride=stride)
+    numeric = df.select_dtypes(include="number")
+    scores, _ = score_rows(numeric.fillna(numeric.median()))
+
+    starts, ends = window_bounds(len(df), window, stride)
+    assert [(entry["start"], entry["end"]) for entry in timeline] == list(zip(starts.tolist(), ends.tolist()))
+    for entry in timeline:
+        part = df.iloc[entry["start"]:entry["end"]]
+        # Only the feature statistics are compared, so skip the forest fit.
+        expected, _ = detect_anomalies(part, detector="robust-z")
+        assert entry["top_features"] == expected["top_features"]
+        assert entry["signals"] == expected["signals"]
+        for feature, mean in entry["window_mean"].items():
+            assert mean == pytest.approx(part[feature].mean(), rel=1e-9)
+        window_scores = scores[entry["start"]:entry["end"]]
+        expected_score = normalize_scores(window_scores.min(), window_scores.max(), window_scores.mean())
+        assert entry["risk_score"] == round(expected_score, 4)
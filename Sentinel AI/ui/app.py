@@ -1,6 +1,7 @@
 import os
 import sys
 import io
+import hashlib
 import pandas as pd
 import streamlit as st
 
@@ -9,7 +10,69 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.append(ROOT)
 
-from backend.pipeline import run_pipeline  # noqa: E402
+from backend.ingest import detect_format, read_table  # noqa: E402
+
+
+# When set, analyses run on the FastAPI backend instead of the Streamlit host.
+BACKEND_URL = os.environ.get("SENTINEL_BACKEND_URL", "").rstrip("/")
+BACKEND_TIMEOUT = float(os.environ.get("SENTINEL_BACKEND_TIMEOUT", "120"))
+# Execution log entries shown before older ones are folded into an expander.
+LOG_PREVIEW = 8
+
+
+@st.cache_resource(show_spinner="Loading SentinelAI engine...")
+def load_engine():
+    # Deferred so the console renders before the detector libraries load; cached across reruns.
+    from backend.pipeline import run_pipeline, warm_up
+
+    warm_up()
+    return run_pipeline
+
+
+@st.cache_resource
+def backend_session():
+    # One pooled session per Streamlit process, so every analyst reuses keep-alive connections.
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def parse_upload(digest, fmt, _payload):
+    # Keyed by the upload hash; the raw bytes are excluded from Streamlit's argument hashing.
+    return read_table(io.BytesIO(_payload), fmt)
+
+
+@st.cache_data(max_entries=128, show_spinner="SentinelAI is analysing...")
+def analyze_local(digest, fmt, mission, _payload):
+    return load_engine()(parse_upload(digest, fmt, _payload), mission=mission)
+
+
+@st.cache_data(max_entries=128, ttl=300, show_spinner="SentinelAI backend is analysing...")
+def analyze_remote(digest, fmt, mission, backend_url, _payload, _filename):
+    response = backend_session().post(
+        f"{backend_url}/analyze",
+        files={"file": (_filename, _payload)},
+        data={"mission": mission, "format": fmt},
+        timeout=BACKEND_TIMEOUT
+    )
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get("detail", response.text)
+        except ValueError:
+            detail = response.text
+        raise RuntimeError(f"Backend returned {response.status_code}: {detail}")
+    return response.json()
+
+
+@st.cache_data
+def template_csv(rows):
+    return pd.DataFrame(rows).to_csv(index=False)
+
 
 st.set_page_config(page_title="SentinelAI", layout="wide")
 st.title("SentinelAI Decision Console")
@@ -21,28 +84,27 @@ Mission-driven AI operations. Issue a mission, feed signals, and let SentinelAI
 )
 
 # Example templates for quick demos
-example_small = pd.DataFrame({
-    "volume": [100, 110, 105, 220, 240],
-    "latency_ms": [120, 118, 125, 210, 230],
-    "errors": [2, 1, 2, 6, 7]
-})
-
-example_multi = pd.DataFrame({
-    "txn_amount": [500, 520, 510, 980, 1020],
-    "txn_count": [50, 48, 52, 130, 140],
-    "chargebacks": [1, 1, 1, 4, 5],
-    "geo_variance": [0.1, 0.12, 0.11, 0.32, 0.35]
-})
+example_small = {
+    "volume": (100, 110, 105, 220, 240),
+    "latency_ms": (120, 118, 125, 210, 230),
+    "errors": (2, 1, 2, 6, 7)
+}
+
+example_multi = {
+    "txn_amount": (500, 520, 510, 980, 1020),
+    "txn_count": (50, 48, 52, 130, 140),
+    "chargebacks": (1, 1, 1, 4, 5),
+    "geo_variance": (0.1, 0.12, 0.11, 0.32, 0.35)
+}
 
 col_a, col_b = st.columns(2)
 with col_a:
-    buf = io.StringIO()
-    example_small.to_csv(buf, index=False)
-    st.download_button("Download Template: Ops Spike", data=buf.getvalue(), file_name="sentinel_ops_spike.csv", mime="text/csv")
+    st.download_button("Download Template: Ops Spike", data=template_csv(example_small), file_name="sentinel_ops_spike.csv", mime="text/csv")
 with col_b:
-    buf = io.StringIO()
-    example_multi.to_csv(buf, index=False)
-    st.download_button("Download Template: Fraud Burst", data=buf.getvalue(), file_name="sentinel_fraud_burst.csv", mime="text/csv")
+    st.download_button("Download Template: Fraud Burst", data=template_csv(example_multi), file_name="sentinel_fraud_burst.csv", mime="text/csv")
+
+if BACKEND_URL:
+    st.caption(f"Analyses run on the SentinelAI backend at {BACKEND_URL}.")
 
 st.divider()
 
@@ -53,8 +115,11 @@ mission_input = st.text_area(
     height=80,
 )
 
-st.subheader("Upload Signals (CSV)")
-uploaded = st.file_uploader("Upload telemetry or event CSV", type=["csv"])
+st.subheader("Upload Signals")
+uploaded = st.file_uploader(
+    "Upload telemetry or event data (CSV, Parquet, Arrow/Feather or NumPy .npy)",
+    type=["csv", "parquet", "pq", "arrow", "feather", "ipc", "npy"]
+)
 
 if "last_output" not in st.session_state:
     st.session_state.last_output = None
@@ -122,17 +187,26 @@ def render_decision(output):
 
     st.subheader("Execution Log")
     log_entries = (output.get("execution_log") or []) + (st.session_state.command_log or [])
-    for entry in log_entries:
-        st.markdown(f"- {entry}")
+    # The log grows with every confirmed command; only the newest entries are rendered up front.
+    older = log_entries[:-LOG_PREVIEW]
+    if older:
+        with st.expander(f"Show {len(older)} earlier entries", expanded=False):
+            st.markdown("\n".join(f"- {entry}" for entry in older))
+    st.markdown("\n".join(f"- {entry}" for entry in log_entries[-LOG_PREVIEW:]))
 
 
 if st.button("Execute Mission"):
     if uploaded is None:
-        st.error("Upload a CSV first to brief SentinelAI.")
+        st.error("Upload a signals file first to brief SentinelAI.")
     else:
         try:
-            df = pd.read_csv(uploaded)
-            output = run_pipeline(df, mission=mission_input)
+            payload = uploaded.getvalue()
+            digest = hashlib.sha256(payload).hexdigest()
+            fmt = detect_format(uploaded.name, uploaded.type)
+            if BACKEND_URL:
+                output = analyze_remote(digest, fmt, mission_input, BACKEND_URL, payload, uploaded.name)
+            else:
+                output = analyze_local(digest, fmt, mission_input, payload)
             st.session_state.last_output = output
         except Exception as exc:
             st.error(f"Failed to process file: {exc}")